@@ -0,0 +1,66 @@
+"""
+Compares processing a chunk plan sequentially and with `execute_chunks()` / `execute_chunks_async()` on a simulated
+I/O bound extractor.
+
+Usage:
+    python benchmarks/bench_chunk_executor.py [latency in ms]
+"""
+import asyncio
+import pathlib
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1].joinpath('src')))
+
+from keboola.utils.chunk_executor import execute_chunks, execute_chunks_async  # noqa: E402
+from keboola.utils.date import ChunkSequence, split_dates_to_chunks  # noqa: E402
+
+
+def main(latency_ms: float = 20):
+    plan = split_dates_to_chunks(datetime(2020, 1, 1), datetime(2021, 1, 1), 0)
+
+    def extract(chunk):
+        time.sleep(latency_ms / 1000)
+        return chunk['start_date']
+
+    start = time.perf_counter()
+    for chunk in plan:
+        extract(chunk)
+    sequential = time.perf_counter() - start
+    print(f"{len(plan)} chunks, {latency_ms} ms each")
+    print(f"{'workers':<10}{'ordered [s]':>13}{'completed [s]':>15}{'speedup':>9}")
+    print(f"{'loop':<10}{sequential:>13.2f}")
+    for workers in (4, 16, 64):
+        timings = []
+        for ordered in (True, False):
+            start = time.perf_counter()
+            for _ in execute_chunks(plan, extract, max_workers=workers, ordered=ordered):
+                pass
+            timings.append(time.perf_counter() - start)
+        print(f"{workers:<10}{timings[0]:>13.2f}{timings[1]:>15.2f}{sequential / timings[0]:>8.1f}x")
+
+
+def main_async(latency_ms: float = 20):
+    plan = ChunkSequence(datetime(2020, 1, 1), datetime(2021, 1, 1), timedelta(hours=1), compact=True)
+
+    async def fetch(chunk):
+        await asyncio.sleep(latency_ms / 1000)
+        return chunk.start
+
+    async def run(max_concurrency):
+        async for _ in execute_chunks_async(plan, fetch, max_concurrency=max_concurrency):
+            pass
+
+    print(f"\nasync, {len(plan)} chunks, {latency_ms} ms each, sequential {len(plan) * latency_ms / 1000:.0f} s")
+    print(f"{'in flight':<10}{'time [s]':>13}{'chunks/s':>15}")
+    for max_concurrency in (100, 500, 2000):
+        start = time.perf_counter()
+        asyncio.run(run(max_concurrency))
+        elapsed = time.perf_counter() - start
+        print(f"{max_concurrency:<10}{elapsed:>13.2f}{len(plan) / elapsed:>15.0f}")
+
+
+if __name__ == '__main__':
+    main(*(float(arg) for arg in sys.argv[1:]))
+    main_async(*(float(arg) for arg in sys.argv[1:]))
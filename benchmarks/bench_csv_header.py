@@ -0,0 +1,60 @@
+"""
+Compares rewriting a CSV file with the `csv` module to rename its columns with `normalize_csv_header()`.
+
+Usage:
+    python benchmarks/bench_csv_header.py [size in MB]
+"""
+import csv
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1].joinpath('src')))
+
+from keboola.utils.csv_header import normalize_csv_header  # noqa: E402
+from keboola.utils.header_normalizer import NormalizerStrategy, get_normalizer  # noqa: E402
+
+NR_COLUMNS = 20
+
+
+def create_file(path: str, size_mb: int):
+    row = ','.join(f'"value {i}"' for i in range(NR_COLUMNS)) + '\n'
+    nr_rows = size_mb * 1024 * 1024 // len(row)
+    with open(path, 'w') as f:
+        f.write(','.join(f'col #{i}' for i in range(NR_COLUMNS)) + '\n')
+        chunk = row * 1000
+        for _ in range(nr_rows // 1000):
+            f.write(chunk)
+
+
+def csv_module_rewrite(path: str, destination: str, normalizer):
+    with open(path, newline='') as in_file, open(destination, 'w', newline='') as out_file:
+        reader = csv.reader(in_file)
+        writer = csv.writer(out_file, lineterminator='\n')
+        writer.writerow(normalizer.normalize_header(next(reader)))
+        writer.writerows(reader)
+
+
+def main(size_mb: int = 200):
+    normalizer = get_normalizer(NormalizerStrategy.DEFAULT, forbidden_sub='_')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, 'source.csv')
+        destination = os.path.join(temp_dir, 'destination.csv')
+        create_file(source, size_mb)
+
+        cases = [
+            ('csv module rewrite', lambda: csv_module_rewrite(source, destination, normalizer)),
+            ('normalize_csv_header, new file', lambda: normalize_csv_header(source, normalizer, destination)),
+            ('normalize_csv_header, in place', lambda: normalize_csv_header(source, normalizer)),
+        ]
+        print(f"{'case':<34}{'time [s]':>10}   ({os.path.getsize(source) / 1024 ** 2:.0f} MB)")
+        for name, fnc in cases:
+            start = time.perf_counter()
+            fnc()
+            print(f"{name:<34}{time.perf_counter() - start:>10.3f}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,180 @@
+"""
+Compares generating chunk plans with the previous `split_dates_to_chunks` implementation, the current one and
+its vectorized (NumPy) backend, the memory of a ten-year hourly plan of dictionaries and `DateChunk` objects
+the number of requests of fixed and adaptive chunks against a simulated API with a varying data volume and
+the balance of equal-length and weighted plans for a pool of workers.
+
+Usage:
+    python benchmarks/bench_date_chunks.py
+"""
+import math
+import pathlib
+import sys
+import time
+import timeit
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1].joinpath('src')))
+
+from keboola.utils.date import ChunkFeedback, ChunkSequence, split_dates_by_weight, split_dates_to_adaptive_chunks, \
+    split_dates_to_chunks  # noqa: E402
+
+START = datetime(1990, 1, 1, tzinfo=timezone.utc)
+END = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+def legacy_split_dates_to_chunks(start_date, end_date, intv, strformat="%Y-%m-%d"):
+    """ The previous implementation formatting both ends of each chunk. """
+    nr_days = (end_date - start_date).days
+    if nr_days <= intv:
+        return [{'start_date': start_date.strftime(strformat), 'end_date': end_date.strftime(strformat)}]
+    elif intv == 0:
+        diff = timedelta(days=1)
+        return [{'start_date': (start_date + diff * i).strftime(strformat),
+                 'end_date': (start_date + diff * i).strftime(strformat)} for i in range(nr_days)]
+    nr_parts = math.ceil(nr_days / intv)
+    diff = (end_date - start_date) / nr_parts
+    return [{'start_date': (start_date + diff * i).strftime(strformat),
+             'end_date': (start_date + diff * (i + 1)).strftime(strformat)} for i in range(nr_parts)]
+
+
+CASES = [
+    ('daily, %Y-%m-%d', 0, "%Y-%m-%d"),
+    ('2 days, %Y-%m-%d %H:%M:%S', 2, "%Y-%m-%d %H:%M:%S"),
+    ('2 days, %d.%m.%Y', 2, "%d.%m.%Y"),
+]
+
+
+def main(number: int = 5):
+    print(f"{(END - START).days} days")
+    print(f"{'case':<30}{'legacy [ms]':>13}{'python [ms]':>13}{'numpy [ms]':>13}{'speedup':>9}")
+    for name, intv, strformat in CASES:
+        legacy = min(timeit.repeat(lambda: legacy_split_dates_to_chunks(START, END, intv, strformat),
+                                   number=1, repeat=number))
+        python = min(timeit.repeat(lambda: split_dates_to_chunks(START, END, intv, strformat),
+                                   number=1, repeat=number))
+        vectorized = min(timeit.repeat(lambda: split_dates_to_chunks(START, END, intv, strformat, vectorized=True),
+                                       number=1, repeat=number))
+        print(f"{name:<30}{legacy * 1e3:>13.2f}{python * 1e3:>13.2f}{vectorized * 1e3:>13.2f}"
+              f"{legacy / vectorized:>8.1f}x")
+
+    for align in ('week', 'month'):
+        python = min(timeit.repeat(lambda: split_dates_to_chunks(START, END, 1, align=align),
+                                   number=1, repeat=number))
+        vectorized = min(timeit.repeat(lambda: split_dates_to_chunks(START, END, 1, align=align, vectorized=True),
+                                       number=1, repeat=number))
+        print(f"{f'aligned to {align}':<30}{'':>13}{python * 1e3:>13.2f}{vectorized * 1e3:>13.2f}"
+              f"{python / vectorized:>8.1f}x")
+
+
+def measure(create_plan):
+    start = time.perf_counter()
+    create_plan()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    plan = create_plan()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return plan, size, elapsed
+
+
+def memory():
+    start, end = datetime(2011, 1, 1, tzinfo=timezone.utc), datetime(2021, 1, 1, tzinfo=timezone.utc)
+    hourly = ChunkSequence(start, end, timedelta(hours=1), "%Y-%m-%d %H:%M:%S")
+    print(f"\nten-year hourly plan, {len(hourly)} chunks")
+    print(f"{'plan':<30}{'memory [MB]':>13}{'bytes/chunk':>13}{'time [ms]':>13}")
+    cases = (('dict', lambda: list(hourly)),
+             ('DateChunk', lambda: list(ChunkSequence(start, end, timedelta(hours=1), "%Y-%m-%d %H:%M:%S",
+                                                      compact=True))),
+             ('DateChunk, half formatted', lambda: [chunk for i, chunk in enumerate(
+                 ChunkSequence(start, end, timedelta(hours=1), "%Y-%m-%d %H:%M:%S", compact=True))
+                 if i % 2 or chunk['start_date']]))
+    for name, create_plan in cases:
+        plan, size, elapsed = measure(create_plan)
+        print(f"{name:<30}{size / 2 ** 20:>13.1f}{size / len(plan):>13.0f}{elapsed * 1e3:>13.0f}")
+        del plan
+
+
+class SimulatedApi:
+    """ API returning `rows_per_day(day)` rows per day, failing on requests with more than `max_rows` rows. """
+    REQUEST_OVERHEAD = 0.5
+    ROWS_PER_SECOND = 200_000
+
+    def __init__(self, rows_per_day, max_rows: int = 500_000):
+        self.rows_per_day = rows_per_day
+        self.max_rows = max_rows
+        self.requests = 0
+        self.failures = 0
+        self.elapsed = 0.0
+
+    def extract(self, start: datetime, end: datetime) -> int:
+        self.requests += 1
+        days = (end - start) / timedelta(days=1)
+        rows = int(self.rows_per_day(start) * days)
+        if rows > self.max_rows:
+            self.failures += 1
+            self.elapsed += self.REQUEST_OVERHEAD + self.max_rows / self.ROWS_PER_SECOND
+            raise TimeoutError()
+        self.elapsed += self.REQUEST_OVERHEAD + rows / self.ROWS_PER_SECOND
+        return rows
+
+
+def adaptive():
+    start, end = datetime(2016, 1, 1, tzinfo=timezone.utc), datetime(2021, 1, 1, tzinfo=timezone.utc)
+    # the volume grows a thousand times over the five years
+    rows_per_day = lambda day: 500 * 1000 ** ((day - start) / (end - start))  # noqa: E731
+    print(f"\nfive years, {rows_per_day(start):.0f} to {rows_per_day(end):.0f} rows per day")
+    print(f"{'plan':<30}{'requests':>13}{'failures':>13}{'API time [s]':>13}")
+
+    for intv in (1, 7):
+        api = SimulatedApi(rows_per_day)
+        for chunk in split_dates_to_chunks(start, end, intv, compact=True, generator=True):
+            try:
+                api.extract(chunk.start, chunk.end)
+            except TimeoutError:
+                pass
+        print(f"{f'fixed, {intv} days':<30}{api.requests:>13}{api.failures:>13}{api.elapsed:>13.0f}")
+
+    api = SimulatedApi(rows_per_day)
+    planner = split_dates_to_adaptive_chunks(start, end, 1, timedelta(minutes=15), 90, target_size=250_000,
+                                             compact=True)
+    for chunk in planner:
+        try:
+            planner.send(ChunkFeedback(size=api.extract(chunk.start, chunk.end)))
+        except TimeoutError as e:
+            planner.send(ChunkFeedback(error=e))
+    print(f"{'adaptive, 250k rows':<30}{api.requests:>13}{api.failures:>13}{api.elapsed:>13.0f}")
+
+
+def weighted(nr_workers: int = 16):
+    start, end = datetime(2011, 1, 1, tzinfo=timezone.utc), datetime(2021, 1, 1, tzinfo=timezone.utc)
+    minute = timedelta(minutes=1)
+    nr_days = (end - start).days
+    # the volume grows a hundred times over the ten years
+    rows_per_day = [int(1000 * 100 ** (day / nr_days)) for day in range(nr_days)]
+    rows_per_minute = [rows // 1440 for rows in rows_per_day for _ in range(1440)]
+    print(f"\nten years, {nr_workers} workers")
+    print(f"{'plan':<30}{'max/mean weight':>16}{'time [ms]':>13}")
+
+    def imbalance(chunks, weights, bucket):
+        chunk_weights = [sum(weights[(chunk.start - start) // bucket:(chunk.end - start) // bucket])
+                         for chunk in chunks]
+        return max(chunk_weights) / (sum(chunk_weights) / len(chunk_weights))
+
+    nr_days_per_chunk = math.ceil(nr_days / nr_workers)
+    chunks = split_dates_to_chunks(start, end, nr_days_per_chunk, compact=True)
+    print(f"{'equal length':<30}{imbalance(chunks, rows_per_day, timedelta(days=1)):>16.2f}{'':>13}")
+    for name, weights, bucket in (('weighted, daily', rows_per_day, timedelta(days=1)),
+                                  ('weighted, per minute', rows_per_minute, minute)):
+        elapsed = min(timeit.repeat(lambda: split_dates_by_weight(start, end, weights, bucket, nr_chunks=nr_workers,
+                                                                  compact=True), number=1, repeat=3))
+        chunks = split_dates_by_weight(start, end, weights, bucket, nr_chunks=nr_workers, compact=True)
+        print(f"{name:<30}{imbalance(chunks, weights, bucket):>16.2f}{elapsed * 1e3:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
+    memory()
+    adaptive()
+    weighted()
@@ -0,0 +1,48 @@
+"""
+Compares the fast ISO / strptime / relative expression parser chain of `keboola.utils.date.parse_date`
+with plain `dateparser.parse`.
+
+Usage:
+    python benchmarks/bench_date_parsing.py
+"""
+import pathlib
+import sys
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1].joinpath('src')))
+
+import dateparser  # noqa: E402
+
+from keboola.utils.date import DateParser, compile_relative_date, parse_date  # noqa: E402
+
+CASES = [
+    ('ISO date', '2021-01-01', None),
+    ('ISO datetime', '2021-01-01T10:00:00', None),
+    ('strptime format', '01/02/2021 10:00', ['%d/%m/%Y %H:%M']),
+    ('relative expression', '5 days ago', None),
+    ('dateparser fallback', 'last month', None),
+]
+
+
+def main(number: int = 2000):
+    print(f"{'case':<22}{'dateparser [us]':>18}{'parse_date [us]':>18}{'speedup':>10}")
+    for name, value, formats in CASES:
+        slow = timeit.timeit(lambda: dateparser.parse(value, date_formats=formats), number=number) / number
+        fast = timeit.timeit(lambda: parse_date(value, formats), number=number) / number
+        print(f"{name:<22}{slow * 1e6:>18.1f}{fast * 1e6:>18.1f}{slow / fast:>9.1f}x")
+
+    offset = compile_relative_date('4 months ago')
+    applied = timeit.timeit(offset.apply, number=number) / number
+    print(f"{'RelativeOffset.apply':<22}{'':>18}{applied * 1e6:>18.1f}")
+
+    print()
+    print(f"{'fallback value':<22}{'default [us]':>18}{'en only [us]':>18}{'speedup':>10}")
+    en_parser = DateParser(languages=['en']).warm_up()
+    for value in ('March 1st 2021', 'last month'):
+        default = timeit.timeit(lambda: parse_date(value), number=number) / number
+        restricted = timeit.timeit(lambda: en_parser.parse(value), number=number) / number
+        print(f"{value:<22}{default * 1e6:>18.1f}{restricted * 1e6:>18.1f}{default / restricted:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Compares renaming columns of wide pandas DataFrames and Arrow tables by rebuilding them with
+`keboola.utils.frame_header` functions, which replace only the column metadata.
+
+Usage:
+    python benchmarks/bench_frame_header.py [number of columns]
+"""
+import pathlib
+import sys
+import timeit
+
+import numpy
+import pandas
+import pyarrow
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1].joinpath('src')))
+
+from keboola.utils.frame_header import normalize_arrow_table, normalize_dataframe_columns  # noqa: E402
+from keboola.utils.header_normalizer import NormalizerStrategy, get_normalizer  # noqa: E402
+
+NR_ROWS = 1000
+REPEAT = 5
+
+
+def rebuild_data_frame(data_frame, normalizer):
+    columns = normalizer.normalize_header([str(c) for c in data_frame.columns])
+    return pandas.DataFrame(data_frame.to_numpy(), columns=columns)
+
+
+def rebuild_table(table, normalizer):
+    columns = normalizer.normalize_header(table.column_names)
+    return pyarrow.table({name: column.to_numpy() for name, column in zip(columns, table.columns)})
+
+
+def main(nr_columns: int = 10_000):
+    normalizer = get_normalizer(NormalizerStrategy.DEFAULT)
+    data = numpy.random.default_rng(0).random((NR_ROWS, nr_columns))
+    data_frame = pandas.DataFrame(data, columns=[f'col #{i}' for i in range(nr_columns)])
+    table = pyarrow.Table.from_pandas(data_frame, preserve_index=False)
+
+    print(f"{nr_columns} columns x {NR_ROWS} rows")
+    print(f"{'case':<20}{'rebuild ms':>12}{'rename ms':>12}{'speedup':>9}")
+    cases = (('pandas DataFrame', rebuild_data_frame, normalize_dataframe_columns, data_frame),
+             ('Arrow Table', rebuild_table, normalize_arrow_table, table))
+    for name, rebuild, rename, obj in cases:
+        rebuild_time = min(timeit.repeat(lambda: rebuild(obj, normalizer), number=1, repeat=REPEAT))
+        rename_time = min(timeit.repeat(lambda: rename(obj, normalizer), number=1, repeat=REPEAT))
+        print(f"{name:<20}{rebuild_time * 1e3:>12.1f}{rename_time * 1e3:>12.1f}{rebuild_time / rename_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,143 @@
+"""
+Benchmarks header normalizer strategies on wide headers against the previous implementations.
+
+Usage:
+    python benchmarks/bench_header_normalizer.py
+"""
+import pathlib
+import random
+import re
+import string
+import sys
+import timeit
+import unicodedata
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1].joinpath('src')))
+
+from keboola.utils.char_encoder import CharEncoder, SupportedEncoder  # noqa: E402
+from keboola.utils.header_normalizer import PERMITTED_CHARS, TRANSLITERATION_OVERRIDES, NormalizerStrategy, \
+    get_normalizer, normalize_records  # noqa: E402
+
+NR_COLUMNS = 50_000
+COLUMN_LENGTH = 24
+
+
+def random_header(alphabet: str, nr_columns: int = NR_COLUMNS, seed: int = 42):
+    rnd = random.Random(seed)
+    return [''.join(rnd.choice(alphabet) for _ in range(COLUMN_LENGTH)) for _ in range(nr_columns)]
+
+
+def legacy_default(header):
+    result = []
+    for column in header:
+        column = "_".join(column.split())
+        result.append(re.sub("[^" + PERMITTED_CHARS + "]", "", column))
+    return result
+
+
+def legacy_encoder(header, encoder: str = 'unicode', delimiter: str = '_'):
+    char_encoder = CharEncoder(encoder)
+    result = []
+    for column in header:
+        characters = list("_".join(column.split()))
+        for i, char in enumerate(characters):
+            if char not in PERMITTED_CHARS:
+                characters[i] = delimiter + str(char_encoder.encode_char(char)) + delimiter
+        result.append("".join(characters))
+    return result
+
+
+def legacy_dict(header, replace_dict):
+    result = []
+    for column in header:
+        for key in replace_dict:
+            column = column.replace(key, replace_dict[key])
+        result.append(column)
+    return result
+
+
+def naive_transliterate(header):
+    """ Transliteration calling `unicodedata` for every character. """
+    result = []
+    for column in header:
+        chars = []
+        for char in '_'.join(column.split()):
+            if char in PERMITTED_CHARS:
+                chars.append(char)
+            elif char in TRANSLITERATION_OVERRIDES:
+                chars.append(TRANSLITERATION_OVERRIDES[char])
+            else:
+                chars.extend(c for c in unicodedata.normalize('NFKD', char) if c in PERMITTED_CHARS)
+        result.append(''.join(chars))
+    return result
+
+
+def random_replace_dict(nr_keys: int, key_length: int, seed: int = 42):
+    rnd = random.Random(seed)
+    replace_dict = {}
+    while len(replace_dict) < nr_keys:
+        key = ''.join(rnd.choice('#@$%&*!?.-+=' + string.ascii_lowercase) for _ in range(key_length))
+        replace_dict[key] = rnd.choice(string.ascii_uppercase) * 2
+    return replace_dict
+
+
+def report(name: str, legacy, current, header, number: int = 3):
+    assert legacy(header) == current(header)
+    legacy_time = timeit.timeit(lambda: legacy(header), number=number) / number
+    current_time = timeit.timeit(lambda: current(header), number=number) / number
+    print(f"{name:<34}{legacy_time * 1e3:>12.1f}{current_time * 1e3:>12.1f}{legacy_time / current_time:>9.1f}x")
+
+
+def main():
+    print(f"{'case':<34}{'legacy [ms]':>12}{'new [ms]':>12}{'speedup':>10}")
+    default = get_normalizer(NormalizerStrategy.DEFAULT)
+    ascii_header = random_header(string.ascii_letters + string.digits + ' #@.-_')
+    report('DEFAULT, ASCII', legacy_default, default.normalize_header, ascii_header)
+    clean_header = random_header(PERMITTED_CHARS)
+    report('DEFAULT, already clean', legacy_default, default.normalize_header, clean_header)
+
+    non_ascii_header = random_header(string.ascii_letters + ' #čřžáé名前列表数据😀🚀')
+    for encoder in ('unicode', 'utf8'):
+        normalizer = get_normalizer(NormalizerStrategy.ENCODER, char_encoder=encoder)
+        report(f'ENCODER {encoder}, CJK / emoji', lambda h: legacy_encoder(h, encoder), normalizer.normalize_header,
+               non_ascii_header)
+    # `utf8` does not encode whole strings, see `utf8_hex`
+    for encoder in (encoder for encoder in SupportedEncoder if encoder != SupportedEncoder.utf8):
+        char_encoder = CharEncoder(encoder)
+        report(f'encode_many {encoder.value}, CJK / emoji',
+               lambda h: [''.join(str(char_encoder.encode_char(c)) for c in column) for column in h],
+               char_encoder.encode_many, non_ascii_header)
+
+    european_header = random_header(string.ascii_letters + ' #čřžáéßøÅüñ名前')
+    transliterate = get_normalizer(NormalizerStrategy.TRANSLITERATE)
+    report('TRANSLITERATE, naive unicodedata', naive_transliterate, transliterate.normalize_header, european_header)
+
+    dict_header = random_header(string.ascii_lowercase + '#@$%&*!?.-+=', nr_columns=10_000)
+    for nr_keys, key_length in ((20, 1), (300, 2), (800, 3)):
+        replace_dict = random_replace_dict(nr_keys, key_length)
+        sequential = get_normalizer(NormalizerStrategy.DICT, replace_dict=replace_dict, sequential_replace=True)
+        single_pass = get_normalizer(NormalizerStrategy.DICT, replace_dict=replace_dict)
+        report(f'DICT sequential, {nr_keys} keys', lambda h: legacy_dict(h, replace_dict),
+               sequential.normalize_header, dict_header, number=1)
+        legacy_time = timeit.timeit(lambda: legacy_dict(dict_header, replace_dict), number=1)
+        current_time = timeit.timeit(lambda: single_pass.normalize_header(dict_header), number=1)
+        print(f"{f'DICT single pass, {nr_keys} keys':<34}{legacy_time * 1e3:>12.1f}{current_time * 1e3:>12.1f}"
+              f"{legacy_time / current_time:>9.1f}x")
+
+    records = [{'user id': i, 'created at': '2021-01-01', 'e-mail': 'a@b.c', 'address': {'zip #': i, 'city': 'x'}}
+               for i in range(100_000)]
+
+    def record_by_record(records):
+        return [dict(zip(default.normalize_header(list(record)), record.values())) for record in records]
+
+    def streaming(records):
+        return list(normalize_records(records, default, flatten=False))
+
+    legacy_time = timeit.timeit(lambda: record_by_record(records), number=1)
+    current_time = timeit.timeit(lambda: streaming(records), number=1)
+    print(f"{'records, 100k':<34}{legacy_time * 1e3:>12.1f}{current_time * 1e3:>12.1f}"
+          f"{legacy_time / current_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
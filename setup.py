@@ -19,6 +19,11 @@ setuptools.setup(
         'dateparser',
         'pytz'
     ],
+    extras_require={
+        'numpy': ['numpy'],
+        'pandas': ['pandas'],
+        'arrow': ['pyarrow']
+    },
     author_email="support@keboola.com",
     description="General utility library for Python applications running in Keboola Connection environment",
     long_description=long_description,
@@ -29,6 +34,11 @@ setuptools.setup(
     include_package_data=True,
     zip_safe=False,
     test_suite='tests',
+    entry_points={
+        'console_scripts': [
+            'keboola-normalize-headers=keboola.utils.csv_header:main'
+        ]
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
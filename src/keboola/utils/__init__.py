@@ -1 +1,20 @@
-from .date import *  # noqa
+# Members of the `date` module are loaded lazily on first access, so importing any submodule
+# (e.g. `keboola.utils.header_normalizer`) does not pull in `dateparser` and `pytz`.
+_DATE_MEMBERS = ('date_tuple', 'date_gen', 'date_chunk', 'RelativeOffset', 'compile_relative_date', 'DateParser',
+                 'DateCache', 'DateCacheInfo', 'parse_date', 'parse_datetime_interval', 'get_past_date',
+                 'add_timezone_info', 'split_dates_to_chunks', 'ChunkAlignment', 'ChunkSequence', 'DateChunk',
+                 'ChunkFeedback', 'split_dates_to_adaptive_chunks', 'split_dates_by_weight', 'DateBatchResult',
+                 'parse_datetime_intervals', 'get_past_dates')
+
+__all__ = list(_DATE_MEMBERS)
+
+
+def __getattr__(name):
+    if name in _DATE_MEMBERS:
+        from . import date
+        return getattr(date, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -3,7 +3,10 @@ Get alphanumerical encoding of characters using different strategies.
 
 """
 
-from typing import Union
+import ast
+import string
+from functools import lru_cache
+from typing import Iterable, List, Tuple, Union
 
 from .helpers import ValidatingEnum
 
@@ -11,6 +14,13 @@ from .helpers import ValidatingEnum
 class SupportedEncoder(ValidatingEnum):
     unicode = "unicode"
     utf8 = "utf8"
+    hex = "hex"
+    base36 = "base36"
+    utf8_hex = "utf8_hex"
+
+
+BMP_SIZE = 0x10000
+BASE36_DIGITS = string.digits + string.ascii_lowercase
 
 
 class CharEncoder:
@@ -21,8 +31,19 @@ class CharEncoder:
 
     Attributes
     ----------
+    encode_type : SupportedEncoder
+        the encoding strategy
     encoder : fnc
         a function used to encode a character with a specific strategy
+    decoder : fnc
+        a function used to decode a string representation of an encoded character
+    token_pattern : str
+        a regular expression matching the string representation of an encoded character
+
+    Whole strings are encoded with `encode_string` and `encode_many` using translation tables precomputed
+    for the Basic Multilingual Plane, so the per-character cost is a table lookup in C. The `utf8` encoder
+    does not encode whole strings, since the representation of bytes (e.g. `b'\\xc5\\xa1'`) contains quotes and
+    backslashes; use the `utf8_hex` encoder (hexadecimal UTF-8 bytes, e.g. `c5a1` for `š`) instead.
 
     """
 
@@ -35,6 +56,9 @@ class CharEncoder:
         """
 
         self.encoder = self._get_encoder(encode_type)
+        self.encode_type = SupportedEncoder.get_by_name(encode_type)
+        self.decoder, self.token_pattern = self._get_decoder(encode_type)
+        self._tables = {}
 
     def encode_char(self, character):
         """encodes a character using an encoder function
@@ -50,6 +74,113 @@ class CharEncoder:
         """
         return self.encoder(character)
 
+    def encode_token(self, character: str) -> str:
+        """encodes a character to its string representation, e.g. `35` for `#` with the unicode encoder
+
+        Parameters
+        ----------
+        character : str
+            character to be encoded
+
+        Returns
+        -------
+        the string representation of the encoded character
+        """
+        if 128 <= ord(character) < BMP_SIZE:
+            return _get_bmp_tokens(self.encode_type)[ord(character)]
+        return str(self.encoder(character))
+
+    def encode_string(self, in_string: str, delimiter: str = "", keep_chars: str = "") -> str:
+        """encodes all characters of a string, except the `keep_chars`
+
+        Parameters
+        ----------
+        in_string : str
+            string to be encoded
+        delimiter : str
+            string put before and after each encoded character
+        keep_chars : str
+            characters that are kept as they are
+
+        Returns
+        -------
+        the encoded string, e.g. `a_35_` for `a#` with the unicode encoder, delimiter `_` and keep_chars `a`
+
+        Raises
+        ------
+        ValueError
+            for the `utf8` encoder, use `utf8_hex` instead
+        """
+        return in_string.translate(self._string_table(delimiter, keep_chars))
+
+    def encode_many(self, strings: Iterable[str], delimiter: str = "", keep_chars: str = "") -> List[str]:
+        """encodes a batch of strings, see `encode_string`
+
+        Parameters
+        ----------
+        strings : Iterable[str]
+            strings to be encoded
+        delimiter : str
+            string put before and after each encoded character
+        keep_chars : str
+            characters that are kept as they are
+
+        Returns
+        -------
+        list of the encoded strings
+
+        Raises
+        ------
+        ValueError
+            for the `utf8` encoder, use `utf8_hex` instead
+        """
+        table = self._string_table(delimiter, keep_chars)
+        return [in_string.translate(table) for in_string in strings]
+
+    def translate_table(self, delimiter: str = "", keep_chars: str = "") -> dict:
+        """returns a `str.translate` table encoding all characters except the `keep_chars`
+
+        The ASCII range is precomputed, the other characters are looked up in a table precomputed for the Basic
+        Multilingual Plane on their first occurrence. The table is built once for each delimiter and kept chars.
+        The `utf8` encoder keeps the representation of bytes, e.g. `b'#'`, for compatibility with existing names.
+
+        Parameters
+        ----------
+        delimiter : str
+            string put before and after each encoded character
+        keep_chars : str
+            characters that are kept as they are
+
+        Returns
+        -------
+        the translation table
+        """
+        key = (delimiter, keep_chars)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = _TranslateTable(self, delimiter, keep_chars)
+        return table
+
+    def _string_table(self, delimiter: str, keep_chars: str) -> dict:
+        if self.encode_type == SupportedEncoder.utf8:
+            raise ValueError("The utf8 encoder does not encode strings to permitted characters, "
+                             "use the utf8_hex encoder instead")
+        return self.translate_table(delimiter, keep_chars)
+
+    def decode_token(self, token: str) -> str:
+        """decodes a string representation of an encoded character back to the character
+
+        Parameters
+        ----------
+        token : str
+            string representation of the value returned by `encode_char`, e.g. `35` for `#`
+
+        Returns
+        -------
+        the decoded character
+        """
+        return self.decoder(token)
+
     @staticmethod
     def _get_encoder(encode_type: Union[SupportedEncoder, str]):
         try:
@@ -58,9 +189,59 @@ class CharEncoder:
                 return ord
             elif _type == SupportedEncoder.utf8:
                 return CharEncoder.encode_utf8
+            elif _type == SupportedEncoder.hex:
+                return CharEncoder.encode_hex
+            elif _type == SupportedEncoder.base36:
+                return CharEncoder.encode_base36
+            elif _type == SupportedEncoder.utf8_hex:
+                return CharEncoder.encode_utf8_hex
         except TypeError:
             raise ValueError(f"Encoder type : {encode_type} not supported")
 
+    @staticmethod
+    def _get_decoder(encode_type: Union[SupportedEncoder, str]):
+        _type = SupportedEncoder.get_by_name(encode_type)
+        if _type == SupportedEncoder.unicode:
+            return CharEncoder.decode_unicode, r"\d+"
+        elif _type == SupportedEncoder.utf8:
+            return CharEncoder.decode_utf8, r"b'(?:[^'\\]|\\.)*'|b\"(?:[^\"\\]|\\.)*\""
+        elif _type == SupportedEncoder.hex:
+            return CharEncoder.decode_hex, r"[0-9a-f]+"
+        elif _type == SupportedEncoder.base36:
+            return CharEncoder.decode_base36, r"[0-9a-z]+"
+        elif _type == SupportedEncoder.utf8_hex:
+            return CharEncoder.decode_utf8_hex, r"(?:[0-9a-f]{2})+"
+
+    @staticmethod
+    def decode_unicode(token):
+        """decodes a unicode code point
+
+        Parameters
+        ----------
+        token : str
+            decimal code point, e.g. `35`
+
+        Returns
+        -------
+        the decoded character
+        """
+        return chr(int(token))
+
+    @staticmethod
+    def decode_utf8(token):
+        """decodes a string representation of utf8 encoded bytes
+
+        Parameters
+        ----------
+        token : str
+            representation of the utf8 encoded character, e.g. `b'\\xc5\\xa1'`
+
+        Returns
+        -------
+        the decoded character
+        """
+        return ast.literal_eval(token).decode('utf8')
+
     @staticmethod
     def encode_utf8(character):
         """encodes a character with utf8 encoding
@@ -75,3 +256,141 @@ class CharEncoder:
         an encoded character with utf8
         """
         return character.encode('utf8')
+
+    @staticmethod
+    def encode_hex(character):
+        """encodes a character as its hexadecimal code point
+
+        Parameters
+        ----------
+        character : str
+            character to be encoded
+
+        Returns
+        -------
+        lowercase hexadecimal code point, e.g. `23` for `#`
+        """
+        return format(ord(character), 'x')
+
+    @staticmethod
+    def decode_hex(token):
+        """decodes a hexadecimal code point
+
+        Parameters
+        ----------
+        token : str
+            hexadecimal code point, e.g. `23`
+
+        Returns
+        -------
+        the decoded character
+        """
+        return chr(int(token, 16))
+
+    @staticmethod
+    def encode_base36(character):
+        """encodes a character as its base36 code point
+
+        Parameters
+        ----------
+        character : str
+            character to be encoded
+
+        Returns
+        -------
+        code point in base36 using digits and lowercase letters, e.g. `z` for `#`
+        """
+        code_point = ord(character)
+        digits = ''
+        while True:
+            code_point, remainder = divmod(code_point, 36)
+            digits = BASE36_DIGITS[remainder] + digits
+            if not code_point:
+                return digits
+
+    @staticmethod
+    def decode_base36(token):
+        """decodes a base36 code point
+
+        Parameters
+        ----------
+        token : str
+            base36 code point, e.g. `z`
+
+        Returns
+        -------
+        the decoded character
+        """
+        return chr(int(token, 36))
+
+    @staticmethod
+    def encode_utf8_hex(character):
+        """encodes a character as hexadecimal digits of its utf8 bytes
+
+        Parameters
+        ----------
+        character : str
+            character to be encoded
+
+        Returns
+        -------
+        lowercase hexadecimal utf8 bytes, e.g. `c5a1` for `š`
+        """
+        return character.encode('utf8', 'surrogatepass').hex()
+
+    @staticmethod
+    def decode_utf8_hex(token):
+        """decodes hexadecimal digits of utf8 bytes
+
+        Parameters
+        ----------
+        token : str
+            hexadecimal utf8 bytes, e.g. `c5a1`
+
+        Returns
+        -------
+        the decoded character
+        """
+        return bytes.fromhex(token).decode('utf8')
+
+
+class _TranslateTable(dict):
+    """
+    A `str.translate` table mapping code points of the kept characters to themselves and the other ones to their
+    delimited encoded form. Non-ASCII characters are added on the first occurrence.
+
+    """
+
+    def __init__(self, char_encoder: CharEncoder, delimiter: str, keep_chars: str):
+        super().__init__((ord(char), char) for char in keep_chars)
+        self._char_encoder = char_encoder
+        self._delimiter = delimiter
+        for code_point in range(128):
+            if code_point not in self:
+                self[code_point] = self.__missing__(code_point)
+
+    def __missing__(self, code_point: int) -> str:
+        token = self._char_encoder.encode_token(chr(code_point))
+        encoded = self[code_point] = self._delimiter + token + self._delimiter
+        return encoded
+
+
+@lru_cache(maxsize=None)
+def _get_bmp_tokens(encode_type: SupportedEncoder) -> Tuple[str, ...]:
+    """string representations of the encoded characters of the Basic Multilingual Plane, indexed by code point"""
+    if encode_type == SupportedEncoder.unicode:
+        return tuple(map(str, range(BMP_SIZE)))
+    if encode_type == SupportedEncoder.hex:
+        return tuple(map('{:x}'.format, range(BMP_SIZE)))
+    if encode_type == SupportedEncoder.base36:
+        tokens = list(BASE36_DIGITS)
+        for code_point in range(len(tokens), BMP_SIZE):
+            tokens.append(tokens[code_point // 36] + BASE36_DIGITS[code_point % 36])
+        return tuple(tokens)
+    if encode_type == SupportedEncoder.utf8_hex:
+        return tuple(chr(code_point).encode('utf8', 'surrogatepass').hex() for code_point in range(BMP_SIZE))
+    if encode_type == SupportedEncoder.utf8:
+        # lone surrogates occur e.g. in file names decoded with `surrogateescape`
+        return tuple(str(chr(code_point).encode('utf8', 'surrogatepass')) for code_point in range(BMP_SIZE))
+    encoder = CharEncoder._get_encoder(encode_type)
+    return tuple(str(encoder(chr(code_point))) for code_point in range(BMP_SIZE))
@@ -0,0 +1,332 @@
+"""
+Parallel execution of date chunk plans, e.g. from `split_dates_to_chunks()` or `ChunkSequence`.
+
+    from keboola.utils.chunk_executor import execute_chunks
+
+    plan = split_dates_to_chunks(start_date, end_date, intv=1, generator=True)
+    for chunk_result in execute_chunks(plan, extract_chunk, max_workers=8, max_retries=3):
+        write_result(chunk_result.result)
+
+Async callables (e.g. using aiohttp or httpx clients) are run concurrently on the event loop:
+
+    async for chunk_result in execute_chunks_async(plan, fetch_chunk, max_concurrency=200, requests_per_second=50):
+        write_result(chunk_result.result)
+
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional, Tuple, Type, \
+    Union
+
+# marks the end of the chunk iterator, chunks themselves may be None
+_EXHAUSTED = object()
+
+ChunkResult = namedtuple('ChunkResult', ['chunk', 'result', 'error', 'attempts'])
+
+
+class ChunkExecutionError(Exception):
+    """
+    Raised when a chunk fails and the execution is cancelled. The original error is the `__cause__`.
+    """
+
+    def __init__(self, message: str, chunk: Any, attempts: int):
+        super().__init__(message, chunk, attempts)
+        self.chunk = chunk
+        self.attempts = attempts
+
+    def __str__(self):
+        return self.args[0]
+
+
+class ChunkCancelledError(Exception):
+    """
+    Error of a chunk whose retries were cancelled after another chunk failed.
+    """
+
+
+def execute_chunks(chunks: Iterable[Any], func: Callable[[Any], Any], max_workers: int = 4,
+                   use_processes: bool = False, ordered: bool = True, max_retries: int = 0,
+                   retry_on: Tuple[Type[BaseException], ...] = (Exception,), backoff: float = 1.0,
+                   backoff_factor: float = 2.0, max_backoff: float = 60.0, jitter: bool = True,
+                   fail_fast: bool = True) -> Iterator[ChunkResult]:
+    """
+    Runs a callable on each chunk of a plan in a thread or process pool and yields the results.
+
+    At most `2 * max_workers` chunks are submitted at a time, so the plan is consumed lazily and may be a generator
+    or a `ChunkSequence` with millions of chunks. Chunks failing with one of the `retry_on` errors are retried
+    in the worker up to `max_retries` times, waiting `backoff * backoff_factor ** (attempt - 1)` seconds (at most
+    `max_backoff`, randomly shortened by up to a half with `jitter`) between the attempts.
+
+    A chunk that fails with a different error or runs out of retries is fatal with `fail_fast`: the chunks that have
+    not started yet are cancelled, the thread workers stop retrying, and `ChunkExecutionError` is raised once the
+    running chunks finish. Otherwise its `ChunkResult` is yielded with the `error` set and the execution continues.
+    Closing the returned generator cancels the remaining chunks as well.
+
+    Args:
+        chunks: Chunks to process, e.g. from `split_dates_to_chunks()`
+        func: Callable processing a single chunk. Must be picklable (e.g. a module level function)
+            with `use_processes`
+        max_workers: Maximal number of chunks processed concurrently
+        use_processes: Use a process pool instead of a thread pool, e.g. for CPU bound processing
+        ordered: Yield the results in the order of the chunks, otherwise as soon as they are completed
+        max_retries: Maximal number of retries of a failed chunk
+        retry_on: Errors that are retried
+        backoff: Delay before the first retry in seconds
+        backoff_factor: Multiplier of the delay for each following retry
+        max_backoff: Maximal delay between retries in seconds
+        jitter: Randomly shorten the delays, so failed chunks are not retried all at once
+        fail_fast: Cancel the execution and raise `ChunkExecutionError` on the first failed chunk
+
+    Returns:
+        Iterator of `ChunkResult`
+
+    Raises:
+        ChunkExecutionError: If a chunk fails with `fail_fast`
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
+    stop_event = None if use_processes else threading.Event()
+    run_chunk = partial(_run_chunk, func, max_retries=max_retries, retry_on=retry_on, backoff=backoff,
+                        backoff_factor=backoff_factor, max_backoff=max_backoff, jitter=jitter, stop_event=stop_event)
+    pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+
+    with pool_class(max_workers=max_workers) as pool:
+        scheduler = _ChunkScheduler(pool, run_chunk, iter(chunks), window=2 * max_workers)
+        try:
+            for future in (scheduler.next_ordered() if ordered else scheduler.next_completed()):
+                chunk = scheduler.pop(future)
+                scheduler.submit()
+                result, error, attempts = future.result()
+                if error is not None and fail_fast:
+                    raise ChunkExecutionError(f"Chunk {chunk} failed after {attempts} attempt(s): {error!r}",
+                                              chunk, attempts) from error
+                yield ChunkResult(chunk, result, error, attempts)
+        finally:
+            if stop_event is not None:
+                stop_event.set()
+            scheduler.cancel()
+
+
+class _ChunkScheduler:
+    """
+    Keeps a bounded window of submitted chunks in the order of submission.
+    """
+
+    def __init__(self, pool: Executor, run_chunk: Callable, chunks: Iterator[Any], window: int):
+        self._pool = pool
+        self._run_chunk = run_chunk
+        self._chunks = chunks
+        self._pending = {}
+        self._order = deque()
+        for _ in range(window):
+            if not self.submit():
+                break
+
+    def submit(self) -> bool:
+        chunk = next(self._chunks, _EXHAUSTED)
+        if chunk is _EXHAUSTED:
+            return False
+        future = self._pool.submit(self._run_chunk, chunk)
+        self._pending[future] = chunk
+        self._order.append(future)
+        return True
+
+    def pop(self, future: Future) -> Any:
+        return self._pending.pop(future)
+
+    def next_ordered(self) -> Iterator[Future]:
+        while self._order:
+            future = self._order.popleft()
+            wait([future])
+            yield future
+
+    def next_completed(self) -> Iterator[Future]:
+        while self._pending:
+            done, _ = wait(self._pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                self._order.remove(future)
+                yield future
+
+    def cancel(self):
+        for future in self._pending:
+            future.cancel()
+
+
+def _run_chunk(func: Callable[[Any], Any], chunk: Any, max_retries: int, retry_on: Tuple[Type[BaseException], ...],
+               backoff: float, backoff_factor: float, max_backoff: float, jitter: bool,
+               stop_event: Optional[threading.Event]) -> Tuple[Any, Optional[BaseException], int]:
+    """
+    Runs the callable with retries in a worker. Errors are returned instead of raised, so the original error
+    (not its traceback string) is passed from a process worker.
+
+    Returns:
+        (result, error, number of attempts)
+    """
+    attempt = 1
+    while True:
+        try:
+            return func(chunk), None, attempt
+        except Exception as e:
+            stopped = stop_event is not None and stop_event.is_set()
+            if not isinstance(e, retry_on) or attempt > max_retries or stopped:
+                return None, e, attempt
+        delay = _retry_delay(attempt, backoff, backoff_factor, max_backoff, jitter)
+        if stop_event is not None:
+            if stop_event.wait(delay):
+                return None, ChunkCancelledError(f"Chunk {chunk} cancelled before retry"), attempt
+        else:
+            time.sleep(delay)
+        attempt += 1
+
+
+def _retry_delay(attempt: int, backoff: float, backoff_factor: float, max_backoff: float, jitter: bool) -> float:
+    delay = min(backoff * backoff_factor ** (attempt - 1), max_backoff)
+    if jitter:
+        delay *= random.uniform(0.5, 1.0)
+    return delay
+
+
+async def iterate_chunks_async(chunks: Iterable[Any], yield_every: int = 1000) -> AsyncIterator[Any]:
+    """
+    Yields the chunks of a plan as an async iterator. Control is passed to the event loop every `yield_every`
+    chunks, so iterating over a large plan does not block other tasks.
+
+    Args:
+        chunks: Chunks, e.g. from `split_dates_to_chunks()` or `ChunkSequence`
+        yield_every: Number of chunks after which the other tasks are let run
+
+    Returns:
+        Async iterator of the chunks
+    """
+    for index, chunk in enumerate(chunks, start=1):
+        yield chunk
+        if index % yield_every == 0:
+            await asyncio.sleep(0)
+
+
+async def execute_chunks_async(chunks: Union[Iterable[Any], AsyncIterable[Any]],
+                               func: Callable[[Any], Awaitable[Any]], max_concurrency: int = 16,
+                               requests_per_second: float = None, ordered: bool = True, max_retries: int = 0,
+                               retry_on: Tuple[Type[BaseException], ...] = (Exception,), backoff: float = 1.0,
+                               backoff_factor: float = 2.0, max_backoff: float = 60.0, jitter: bool = True,
+                               fail_fast: bool = True) -> AsyncIterator[ChunkResult]:
+    """
+    Runs an async callable on each chunk of a plan concurrently and yields the results, the async counterpart
+    of `execute_chunks()`.
+
+    At most `max_concurrency` chunks are processed at a time, so the plan is consumed lazily. With
+    `requests_per_second`, the calls (retries included) are spaced evenly to respect the rate limit of an API.
+    Retries, `fail_fast` and the order of the results work the same as in `execute_chunks()`, except that
+    the running chunks are cancelled on a fatal error as well.
+
+    Args:
+        chunks: Chunks to process, a plain or an async iterable
+        func: Async callable processing a single chunk
+        max_concurrency: Maximal number of chunks processed concurrently
+        requests_per_second: Maximal number of calls of `func` per second, unlimited by default
+        ordered: Yield the results in the order of the chunks, otherwise as soon as they are completed
+        max_retries: Maximal number of retries of a failed chunk
+        retry_on: Errors that are retried
+        backoff: Delay before the first retry in seconds
+        backoff_factor: Multiplier of the delay for each following retry
+        max_backoff: Maximal delay between retries in seconds
+        jitter: Randomly shorten the delays, so failed chunks are not retried all at once
+        fail_fast: Cancel the execution and raise `ChunkExecutionError` on the first failed chunk
+
+    Returns:
+        Async iterator of `ChunkResult`
+
+    Raises:
+        ChunkExecutionError: If a chunk fails with `fail_fast`
+    """
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+
+    limiter = _RateLimiter(requests_per_second) if requests_per_second else None
+    chunk_iterator = chunks.__aiter__() if hasattr(chunks, '__aiter__') else iterate_chunks_async(chunks)
+    pending = {}
+    order = deque()
+
+    async def submit() -> bool:
+        try:
+            chunk = await chunk_iterator.__anext__()
+        except StopAsyncIteration:
+            return False
+        task = asyncio.ensure_future(_run_chunk_async(func, chunk, limiter, max_retries, retry_on, backoff,
+                                                      backoff_factor, max_backoff, jitter))
+        pending[task] = chunk
+        if ordered:
+            order.append(task)
+        return True
+
+    try:
+        for _ in range(max_concurrency):
+            if not await submit():
+                break
+        while pending:
+            if ordered:
+                done = [order.popleft()]
+                await asyncio.wait(done)
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                chunk = pending.pop(task)
+                await submit()
+                result, error, attempts = task.result()
+                if error is not None and fail_fast:
+                    raise ChunkExecutionError(f"Chunk {chunk} failed after {attempts} attempt(s): {error!r}",
+                                              chunk, attempts) from error
+                yield ChunkResult(chunk, result, error, attempts)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _run_chunk_async(func: Callable[[Any], Awaitable[Any]], chunk: Any, limiter: Optional['_RateLimiter'],
+                           max_retries: int, retry_on: Tuple[Type[BaseException], ...], backoff: float,
+                           backoff_factor: float, max_backoff: float,
+                           jitter: bool) -> Tuple[Any, Optional[BaseException], int]:
+    """
+    Runs the async callable with retries, see `_run_chunk()`.
+    """
+    attempt = 1
+    while True:
+        if limiter is not None:
+            await limiter.acquire()
+        try:
+            return await func(chunk), None, attempt
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not isinstance(e, retry_on) or attempt > max_retries:
+                return None, e, attempt
+        await asyncio.sleep(_retry_delay(attempt, backoff, backoff_factor, max_backoff, jitter))
+        attempt += 1
+
+
+class _RateLimiter:
+    """
+    Spaces acquisitions evenly to at most `rate` per second.
+    """
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError(f"requests_per_second must be positive, got {rate}")
+        self._interval = 1 / rate
+        self._next_time = 0.0
+
+    async def acquire(self):
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next_time)
+        self._next_time = start + self._interval
+        if start > now:
+            await asyncio.sleep(start - now)
@@ -0,0 +1,474 @@
+"""
+Streaming normalization of CSV file headers.
+
+Only the first record of the file is parsed and normalized, the rest of the file is copied as is using
+zero-copy system calls where available (`copy_file_range`, `sendfile`), so the cost does not depend on parsing
+the file body. If the normalized header has the same byte length, the file is rewritten in place.
+
+Supported are ASCII compatible encodings (e.g. utf-8, utf-8-sig, latin-1) and `\r\n`, `\n` or `\r` line endings.
+
+Whole directory trees of tables can be processed in parallel with `normalize_tables()` or from the command line:
+
+    keboola-normalize-headers out/tables --strategy DEFAULT --param forbidden_sub=_ --workers 8
+
+"""
+
+import argparse
+import csv
+import fnmatch
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, List, Optional, Tuple, Union
+
+from .header_normalizer import HeaderNormalizer, NormalizerStrategy, get_normalizer
+
+COPY_BUFFER_SIZE = 1024 * 1024
+MANIFEST_SUFFIX = '.manifest'
+# line endings recognized by the `csv` module
+_LINE_END = re.compile(rb'\r\n|\r|\n')
+
+PathType = Union[str, os.PathLike]
+
+
+def read_csv_header(path: PathType, encoding: str = 'utf-8', dialect: Union[str, csv.Dialect] = 'excel',
+                    **fmtparams) -> List[str]:
+    """
+    Reads only the header (first record) of a CSV file. Quoted multiline column names are supported.
+
+    Args:
+        path: Path to the CSV file
+        encoding: Encoding of the file
+        dialect: CSV dialect of the file, same as in the `csv` module
+        **fmtparams: Additional CSV formatting parameters, same as in the `csv` module
+
+    Returns:
+        List of columns, empty list if the file is empty
+    """
+    with open(path, 'rb') as in_file:
+        header, _, _ = _read_header_record(in_file, encoding, dialect, **fmtparams)
+    return header
+
+
+def normalize_csv_header(path: PathType, normalizer: HeaderNormalizer, destination_path: PathType = None,
+                         encoding: str = 'utf-8', dialect: Union[str, csv.Dialect] = 'excel',
+                         **fmtparams) -> List[str]:
+    """
+    Normalizes the header of a CSV file without parsing the rest of the file.
+
+    The file body is copied to the destination with `copy_file_range` / `sendfile` where available, otherwise
+    with large buffered copies. When no destination is specified, the file is modified in place; if the normalized
+    header has the same byte length as the original one, only the header bytes are overwritten, otherwise
+    the file is rewritten to a temporary file which then replaces the original one.
+
+    Args:
+        path: Path to the CSV file
+        normalizer: `HeaderNormalizer` used to normalize the columns, e.g. from `get_normalizer()`
+        destination_path: Optional path of the output file. Default: modify the file in place
+        encoding: Encoding of the file
+        dialect: CSV dialect of the file, same as in the `csv` module
+        **fmtparams: Additional CSV formatting parameters, same as in the `csv` module
+
+    Returns:
+        The normalized header
+    """
+    with open(path, 'rb') as in_file:
+        header, header_size, line_terminator = _read_header_record(in_file, encoding, dialect, **fmtparams)
+        if not header:
+            if destination_path is not None:
+                shutil.copyfile(path, destination_path)
+            return header
+
+        normalized_header = normalizer.normalize_header(header)
+        new_header_bytes = _format_header_record(normalized_header, line_terminator, encoding, dialect,
+                                                 **fmtparams)
+
+        if destination_path is not None:
+            with open(destination_path, 'wb') as out_file:
+                out_file.write(new_header_bytes)
+                out_file.flush()
+                _copy_range(in_file, out_file, header_size)
+            return normalized_header
+
+        if len(new_header_bytes) != header_size:
+            directory = os.path.dirname(os.path.abspath(path))
+            with tempfile.NamedTemporaryFile('wb', dir=directory, delete=False) as out_file:
+                try:
+                    out_file.write(new_header_bytes)
+                    out_file.flush()
+                    _copy_range(in_file, out_file, header_size)
+                except BaseException:
+                    os.unlink(out_file.name)
+                    raise
+            shutil.copymode(path, out_file.name)
+            os.replace(out_file.name, path)
+            return normalized_header
+
+    # same byte length, only the header bytes are overwritten
+    with open(path, 'r+b') as out_file:
+        out_file.write(new_header_bytes)
+    return normalized_header
+
+
+def _read_header_record(in_file, encoding: str, dialect: Union[str, csv.Dialect],
+                        **fmtparams) -> Tuple[List[str], int, str]:
+    """
+    Parses the first record of a binary file object line by line, so only the lines that belong to the header
+    are read.
+
+    Returns:
+        header, size of the header record in bytes (including the line terminator), the line terminator
+    """
+    consumed_lines = []
+
+    def lines():
+        first = True
+        for line in _binary_lines(in_file):
+            consumed_lines.append(line)
+            # decode with the BOM handling of the codec only at the start of the file
+            yield line.decode(encoding if first else _without_bom(encoding))
+            first = False
+
+    reader = csv.reader(lines(), dialect, **fmtparams)
+    header = next(reader, [])
+    last_line = consumed_lines[-1] if consumed_lines else b''
+    if last_line.endswith(b'\r\n'):
+        line_terminator = '\r\n'
+    elif last_line.endswith(b'\n'):
+        line_terminator = '\n'
+    elif last_line.endswith(b'\r'):
+        line_terminator = '\r'
+    else:
+        line_terminator = ''
+    return header, sum(len(line) for line in consumed_lines), line_terminator
+
+
+def _binary_lines(in_file, block_size: int = io.DEFAULT_BUFFER_SIZE):
+    """
+    Yields lines of a binary file object ending with `\r\n`, `\n` or `\r`, the last line may have no line ending.
+    Unlike `readline()`, a file with `\r` line endings is not read as a single line.
+    """
+    buffer = bytearray()
+    position = 0
+    while True:
+        block = in_file.read(block_size)
+        buffer += block
+        while True:
+            match = _LINE_END.search(buffer, position)
+            # `\r` at the end of the buffer may be followed by `\n` in the next block
+            if match is None or (block and match.group() == b'\r' and match.end() == len(buffer)):
+                break
+            yield bytes(buffer[:match.end()])
+            del buffer[:match.end()]
+            position = 0
+        if not block:
+            if buffer:
+                yield bytes(buffer)
+            return
+        position = max(len(buffer) - 1, 0)
+
+
+def _format_header_record(header: List[str], line_terminator: str, encoding: str,
+                          dialect: Union[str, csv.Dialect], **fmtparams) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, dialect, **{**fmtparams, 'lineterminator': line_terminator})
+    writer.writerow(header)
+    return buffer.getvalue().encode(encoding)
+
+
+def _without_bom(encoding: str) -> str:
+    return 'utf-8' if encoding.lower().replace('_', '-') == 'utf-8-sig' else encoding
+
+
+def _copy_range(in_file, out_file, offset: int):
+    """
+    Copies the input file from the offset to the end to the current position of the output file.
+
+    Uses `os.copy_file_range` or `os.sendfile` where supported, otherwise a buffered copy.
+    """
+    in_fd, out_fd = in_file.fileno(), out_file.fileno()
+    remaining = os.fstat(in_fd).st_size - offset
+    out_offset = out_file.tell()
+
+    for copy_fnc in (_copy_file_range, _sendfile):
+        try:
+            copied = copy_fnc(in_fd, out_fd, offset, out_offset, remaining)
+        except (AttributeError, OSError):
+            continue
+        offset, out_offset, remaining = offset + copied, out_offset + copied, remaining - copied
+        if remaining <= 0:
+            out_file.seek(out_offset)
+            return
+
+    in_file.seek(offset)
+    out_file.seek(out_offset)
+    shutil.copyfileobj(in_file, out_file, COPY_BUFFER_SIZE)
+
+
+def _copy_file_range(in_fd: int, out_fd: int, offset: int, out_offset: int, count: int) -> int:
+    copied = 0
+    while copied < count:
+        sent = os.copy_file_range(in_fd, out_fd, count - copied, offset + copied, out_offset + copied)
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def _sendfile(in_fd: int, out_fd: int, offset: int, out_offset: int, count: int) -> int:
+    os.lseek(out_fd, out_offset, os.SEEK_SET)
+    copied = 0
+    while copied < count:
+        sent = os.sendfile(out_fd, in_fd, offset + copied, count - copied)
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+FileResult = namedtuple('FileResult', ['path', 'columns', 'error'])
+
+
+class NormalizationReport:
+    """
+    Result of `normalize_tables()` with per-file results and throughput totals.
+
+    Attributes:
+        results: List of `FileResult(path, columns, error)`, one per processed table
+        elapsed: Wall time of the run in seconds
+    """
+
+    def __init__(self, results: List[FileResult], elapsed: float):
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def errors(self) -> List[FileResult]:
+        return [result for result in self.results if result.error is not None]
+
+    @property
+    def nr_files(self) -> int:
+        return len(self.results)
+
+    @property
+    def nr_columns(self) -> int:
+        return sum(result.columns for result in self.results)
+
+    @property
+    def files_per_second(self) -> float:
+        return self.nr_files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def columns_per_second(self) -> float:
+        return self.nr_columns / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (f"Normalized {self.nr_files} files ({self.nr_columns} columns) in {self.elapsed:.2f} s, "
+                f"{self.files_per_second:.1f} files/s, {self.columns_per_second:.1f} columns/s, "
+                f"{len(self.errors)} errors")
+
+
+def normalize_tables(directory: PathType, strategy: NormalizerStrategy = NormalizerStrategy.DEFAULT,
+                     normalizer_params: dict = None, workers: int = None, manifests: bool = True,
+                     pattern: str = '*.csv', encoding: str = 'utf-8', dialect: Union[str, csv.Dialect] = 'excel',
+                     **fmtparams) -> NormalizationReport:
+    """
+    Normalizes headers of all CSV tables in a directory tree (e.g. `out/tables`) in parallel processes.
+
+    If a table has a sidecar manifest (`<table>.manifest`) with a `columns` list, the table itself is headless
+    (as in Keboola Connection) and the manifest columns, primary key and column metadata are normalized instead.
+    Otherwise the CSV header is normalized and the primary key and column metadata of the manifest are renamed
+    accordingly.
+    Sliced tables (directories named by the pattern) are processed only through their manifests.
+
+    Args:
+        directory: Root directory to search for tables
+        strategy: Normalization strategy, see `get_normalizer()`
+        normalizer_params: Parameters of the normalizer, see `get_normalizer()`
+        workers: Number of worker processes. Default: number of CPUs; 1 processes the tables in the current process
+        manifests: Normalize columns in sidecar manifests
+        pattern: `fnmatch` pattern of the table names
+        encoding: Encoding of the files
+        dialect: CSV dialect of the files, same as in the `csv` module
+        **fmtparams: Additional CSV formatting parameters, same as in the `csv` module
+
+    Returns:
+        NormalizationReport with per-file results; errors are reported per file and do not stop the run
+    """
+    # fail fast on invalid normalizer configuration
+    normalizer = get_normalizer(strategy, **(normalizer_params or {}))
+
+    paths = _find_tables(directory, pattern, manifests)
+    normalize_table = partial(_normalize_table, manifests=manifests, encoding=encoding, dialect=dialect,
+                              fmtparams=fmtparams)
+
+    start = time.perf_counter()
+    if workers == 1 or len(paths) <= 1:
+        results = list(map(partial(normalize_table, normalizer=normalizer), paths))
+    else:
+        workers = workers or os.cpu_count() or 1
+        # normalizers are built once per process
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(strategy, normalizer_params or {})) as executor:
+            chunksize = max(1, len(paths) // (workers * 4))
+            results = list(executor.map(normalize_table, paths, chunksize=chunksize))
+    return NormalizationReport(results, time.perf_counter() - start)
+
+
+def _find_tables(directory: PathType, pattern: str, manifests: bool) -> List[str]:
+    paths = []
+    for root, dir_names, file_names in os.walk(directory):
+        for name in sorted(file_names):
+            if fnmatch.fnmatch(name, pattern):
+                paths.append(os.path.join(root, name))
+        # sliced tables, the slices are headless and are never processed on their own
+        sliced_tables = [name for name in sorted(fnmatch.filter(dir_names, pattern))
+                         if os.path.isfile(os.path.join(root, name) + MANIFEST_SUFFIX)]
+        for name in sliced_tables:
+            dir_names.remove(name)
+            if manifests:
+                paths.append(os.path.join(root, name))
+    return paths
+
+
+_worker_normalizer: Optional[HeaderNormalizer] = None
+
+
+def _init_worker(strategy: NormalizerStrategy, normalizer_params: dict):
+    global _worker_normalizer
+    _worker_normalizer = get_normalizer(strategy, **normalizer_params)
+
+
+def _normalize_table(path: str, manifests: bool, encoding: str, dialect: Union[str, csv.Dialect], fmtparams: dict,
+                     normalizer: HeaderNormalizer = None) -> FileResult:
+    if normalizer is None:
+        normalizer = _worker_normalizer
+    try:
+        manifest_path = path + MANIFEST_SUFFIX
+        has_manifest = manifests and os.path.isfile(manifest_path)
+        if has_manifest:
+            columns = normalize_manifest_columns(manifest_path, normalizer)
+            if columns is not None:
+                return FileResult(path, len(columns), None)
+        if os.path.isdir(path):
+            return FileResult(path, 0, None)
+        if not has_manifest:
+            return FileResult(path, len(normalize_csv_header(path, normalizer, None, encoding, dialect,
+                                                             **fmtparams)), None)
+
+        # the manifest references the columns of the header
+        header = read_csv_header(path, encoding, dialect, **fmtparams)
+        normalized = normalize_csv_header(path, normalizer, None, encoding, dialect, **fmtparams)
+        _rename_manifest_columns(manifest_path, dict(zip(header, normalized)))
+        return FileResult(path, len(normalized), None)
+    except Exception as e:
+        return FileResult(path, 0, e)
+
+
+def normalize_manifest_columns(manifest_path: PathType, normalizer: HeaderNormalizer) -> Optional[List[str]]:
+    """
+    Normalizes the `columns` of a table manifest, along with the `primary_key` and `column_metadata` referencing them.
+
+    Args:
+        manifest_path: Path to the manifest file
+        normalizer: `HeaderNormalizer` used to normalize the columns
+
+    Returns:
+        The normalized columns or None if the manifest does not specify columns (the table has a header)
+    """
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    columns = manifest.get('columns')
+    if not columns:
+        return None
+
+    normalized = normalizer.normalize_header(columns)
+    manifest['columns'] = normalized
+    _rename_column_references(manifest, dict(zip(columns, normalized)))
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    return normalized
+
+
+def _rename_manifest_columns(manifest_path: PathType, mapping: dict):
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if _rename_column_references(manifest, mapping):
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+
+
+def _rename_column_references(manifest: dict, mapping: dict) -> bool:
+    """
+    Renames the columns referenced by the `primary_key` and `column_metadata` of a manifest.
+
+    Returns:
+        True if the manifest references any columns
+    """
+    renamed = False
+    if manifest.get('primary_key'):
+        manifest['primary_key'] = [mapping.get(column, column) for column in manifest['primary_key']]
+        renamed = True
+    if isinstance(manifest.get('column_metadata'), dict):
+        manifest['column_metadata'] = {mapping.get(column, column): metadata
+                                       for column, metadata in manifest['column_metadata'].items()}
+        renamed = True
+    return renamed
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Command line entry point, see `keboola-normalize-headers --help`.
+    """
+    description = ('Normalizes headers of CSV tables (and their manifests) in a directory tree '
+                   'to a format supported by Keboola Connection Storage.')
+    parser = argparse.ArgumentParser(prog='keboola-normalize-headers', description=description)
+    parser.add_argument('directory', help='Root directory with tables, e.g. out/tables')
+    parser.add_argument('--strategy', default=NormalizerStrategy.DEFAULT.value,
+                        choices=[s.value for s in NormalizerStrategy], help='Normalization strategy')
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                        help='Normalizer parameter, e.g. forbidden_sub=_ (repeatable). '
+                             'Values are parsed as JSON if possible, e.g. replace_dict={"#": "hsh"}')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes. Default: CPU count')
+    parser.add_argument('--no-manifests', action='store_true', help='Do not normalize columns in manifests')
+    parser.add_argument('--pattern', default='*.csv', help='Pattern of the table file names. Default: *.csv')
+    parser.add_argument('--encoding', default='utf-8', help='Encoding of the files. Default: utf-8')
+    parser.add_argument('--delimiter', default=',', help='CSV delimiter. Default: ,')
+    parser.add_argument('--quotechar', default='"', help='CSV quote character. Default: "')
+    args = parser.parse_args(argv)
+
+    try:
+        params = dict(_parse_param(param) for param in args.param)
+        report = normalize_tables(args.directory, NormalizerStrategy(args.strategy), params, args.workers,
+                                  not args.no_manifests, args.pattern, args.encoding,
+                                  delimiter=args.delimiter, quotechar=args.quotechar)
+    except (ValueError, TypeError) as e:
+        parser.error(str(e))
+
+    for result in report.errors:
+        print(f"{result.path}: {result.error}", file=sys.stderr)
+    print(report)
+    return 1 if report.errors else 0
+
+
+def _parse_param(param: str) -> Tuple[str, Any]:
+    name, separator, value = param.partition('=')
+    if not separator:
+        raise ValueError(f"Invalid parameter '{param}', expected NAME=VALUE")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+
+if __name__ == '__main__':
+    sys.exit(main())
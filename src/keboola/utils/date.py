@@ -1,18 +1,390 @@
+"""
+Date related helper functions.
+
+Heavy third party dependencies (`dateparser`, `pytz`, `dateutil`) are imported lazily on the first call
+that needs them, so importing this module (or the `keboola.utils` package) stays cheap.
+
+"""
+import calendar
 import math
-from _datetime import timedelta
-from datetime import datetime
-from typing import Tuple, Generator, Union, Dict, List
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, abc, namedtuple
+from functools import lru_cache
+from itertools import accumulate
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from typing import Any, Callable, Hashable, Iterable, Iterator, Tuple, Generator, Union, Dict, List, Mapping, \
+    Optional, Sequence
 
-import dateparser
-import pytz
-from dateutil.relativedelta import relativedelta
+from .helpers import ValidatingEnum
+
+__all__ = ['date_tuple', 'date_gen', 'date_chunk', 'RelativeOffset', 'compile_relative_date', 'DateParser',
+           'DateCache', 'DateCacheInfo', 'parse_date', 'parse_datetime_interval', 'get_past_date', 'add_timezone_info',
+           'split_dates_to_chunks', 'ChunkAlignment', 'ChunkSequence', 'DateChunk', 'ChunkFeedback',
+           'split_dates_to_adaptive_chunks', 'split_dates_by_weight', 'DateBatchResult', 'parse_datetime_intervals',
+           'get_past_dates']
 
 date_tuple = Union[Tuple[datetime, datetime], Tuple[str, str]]
 date_gen = Generator[Dict[str, datetime], None, None]
 date_chunk = Union[date_gen, List]
 
+# subset of ISO-8601 that `datetime.fromisoformat` and `dateparser` resolve to the same naive datetime
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{3}(?:\d{3})?)?)?)?")
+# a strptime format has to fully specify the date (year, month, day), otherwise dateparser fills the gaps
+# from its settings
+_FORMAT_DATE_PARTS_RE = (re.compile(r"%[Yy]"), re.compile(r"%[mbB]"), re.compile(r"%d"))
+
+_RELATIVE_UNITS = "second|minute|hour|day|week|month|year"
+_RELATIVE_RE = re.compile(rf"(?P<amount>\d+)\s+(?P<unit>{_RELATIVE_UNITS})s?\s+ago"
+                          rf"|in\s+(?P<in_amount>\d+)\s+(?P<in_unit>{_RELATIVE_UNITS})s?"
+                          r"|(?P<keyword>now|today|yesterday|tomorrow)", re.IGNORECASE)
+_RELATIVE_KEYWORD_DAYS = {'now': 0, 'today': 0, 'yesterday': -1, 'tomorrow': 1}
+
+
+class RelativeOffset:
+    """
+    A compiled relative date expression, e.g. `3 days ago` or `yesterday`.
+
+    The offset is resolved once by `compile_relative_date()` and can then be applied to any anchor
+    datetime without parsing the expression again.
+
+    Attributes:
+        expression: The original expression
+        months: Calendar month part of the offset (years are expressed in months)
+        delta: Fixed length part of the offset
+    """
+    __slots__ = ('expression', 'months', 'delta')
+
+    def __init__(self, expression: str, months: int = 0, delta: timedelta = timedelta(0)):
+        self.expression = expression
+        self.months = months
+        self.delta = delta
+
+    def apply(self, anchor: datetime = None, tz: tzinfo = None) -> datetime:
+        """
+        Returns the date the expression resolves to, relative to the anchor.
+
+        Month arithmetic clips the day to the length of the target month (e.g. `1 month ago` from 2021-03-31
+        is 2021-02-28), same as `dateparser` and `dateutil.relativedelta`.
+
+        Args:
+            anchor: A date, from which the offset is calculated. Default: current time (in `tz` if specified)
+            tz: Optional timezone; a naive anchor is made aware in this timezone
+
+        Returns:
+            datetime
+        """
+        if anchor is None:
+            anchor = datetime.now(tz)
+        elif tz is not None:
+            anchor = add_timezone_info(anchor, tz)
+
+        if self.months:
+            month_index = anchor.year * 12 + anchor.month - 1 + self.months
+            year, month = divmod(month_index, 12)
+            month += 1
+            day = min(anchor.day, calendar.monthrange(year, month)[1])
+            anchor = anchor.replace(year=year, month=month, day=day)
+        return anchor + self.delta
+
+    def __eq__(self, other):
+        if not isinstance(other, RelativeOffset):
+            return NotImplemented
+        return (self.months, self.delta) == (other.months, other.delta)
+
+    def __hash__(self):
+        return hash((self.months, self.delta))
+
+    def __repr__(self):
+        return f"RelativeOffset({self.expression!r}, months={self.months}, delta={self.delta!r})"
+
+
+@lru_cache(maxsize=256)
+def compile_relative_date(expression: str) -> Optional[RelativeOffset]:
+    """
+    Compiles a simple relative date expression into a reusable `RelativeOffset`.
+
+    Supported grammar (case insensitive):
+    `now`, `today`, `yesterday`, `tomorrow`, `<N> <unit>[s] ago` and `in <N> <unit>[s]`,
+    where unit is one of second, minute, hour, day, week, month, year.
+
+    Args:
+        expression: Relative date expression, e.g. `5 hours ago`
+
+    Returns:
+        RelativeOffset or None if the expression is not supported by the compiled grammar
+    """
+    match = _RELATIVE_RE.fullmatch(expression.strip())
+    if not match:
+        return None
+
+    if match.group('keyword'):
+        return RelativeOffset(expression, delta=timedelta(days=_RELATIVE_KEYWORD_DAYS[match.group('keyword').lower()]))
+
+    if match.group('amount'):
+        amount, unit = -int(match.group('amount')), match.group('unit').lower()
+    else:
+        amount, unit = int(match.group('in_amount')), match.group('in_unit').lower()
+
+    if unit == 'year':
+        return RelativeOffset(expression, months=amount * 12)
+    elif unit == 'month':
+        return RelativeOffset(expression, months=amount)
+    else:
+        return RelativeOffset(expression, delta=timedelta(**{unit + 's': amount}))
+
+
+# dateparser settings that do not change results of the ISO / strptime / relative expression fast paths;
+# any other setting disables them
+_FAST_PATH_SAFE_SETTINGS = {'PREFER_DAY_OF_MONTH', 'PREFER_MONTH_OF_YEAR', 'PREFER_DATES_FROM',
+                            'PREFER_LOCALE_DATE_ORDER', 'RELATIVE_BASE', 'SKIP_TOKENS', 'NORMALIZE',
+                            'RETURN_TIME_AS_PERIOD', 'REQUIRE_PARTS', 'CACHE_SIZE_LIMIT', 'DEFAULT_LANGUAGES',
+                            'LANGUAGE_DETECTION_CONFIDENCE_THRESHOLD'}
+
+
+class DateParser:
+    """
+    A reusable date parser engine.
+
+    Wraps a single `dateparser.date.DateDataParser` restricted to the specified languages / locales with fixed
+    settings, so the language detection and locale data loading is not repeated for each parsed value.
+    Cheap fast paths (ISO-8601, `strptime` formats, simple relative expressions) are tried first, see `parse()`.
+
+    The `dateparser` library itself is imported on the first fallback or on `warm_up()`.
+
+    Usage example:
+
+        parser = DateParser(languages=['en']).warm_up()
+        start_date, end_date = parse_datetime_interval('5 days ago', 'today', parser=parser)
+    """
+
+    def __init__(self, languages: List[str] = None, locales: List[str] = None, region: str = None,
+                 settings: dict = None, date_formats: Sequence[str] = None):
+        """
+
+        Args:
+            languages: List of language codes, e.g. ['en', 'cs']. Default: all languages (auto-detected)
+            locales: List of locale codes, e.g. ['en-GB']. Default: derived from languages and region
+            region: Region code used to construct locales from languages, e.g. 'GB'
+            settings: Fixed `dateparser` settings, see `dateparser.conf.Settings`
+            date_formats: Default list of `strptime` formats tried for each parsed value
+        """
+        self.languages = languages
+        self.locales = locales
+        self.region = region
+        self.settings = dict(settings or {})
+        self.date_formats = date_formats
+        self._data_parser = None
+
+        self._fast_paths_enabled = set(self.settings).issubset(_FAST_PATH_SAFE_SETTINGS)
+        # the compiled relative grammar is English
+        english_language = languages is None or 'en' in languages
+        english_locale = locales is None or any(loc.split('-')[0] == 'en' for loc in locales)
+        self._relative_enabled = self._fast_paths_enabled and english_language and english_locale
+
+    def parse(self, date_string: str, date_formats: Sequence[str] = None) -> Optional[datetime]:
+        """
+        Parses a date string, trying the cheap parsers first:
+
+        1. caller supplied `strptime` formats
+        2. ISO-8601 date or naive datetime (e.g. `2021-01-01`, `2021-01-01T10:00:00`) via `datetime.fromisoformat`
+        3. simple relative expressions, see `compile_relative_date()`
+        4. `dateparser` for any other supported formats
+
+        The fast paths are used only where they return exactly what `dateparser` would with the same configuration.
+
+        Args:
+            date_string: YYYY-MM-DD or relative string supported by date parser e.g. 5 days ago
+            date_formats: Optional list of `strptime` formats. Default: formats the parser was created with
+
+        Returns:
+            datetime or None if the string could not be parsed
+        """
+        date_formats = date_formats or self.date_formats
+        parsed = None
+        if self._fast_paths_enabled:
+            # dateparser tries the custom formats before the absolute date parsing
+            if date_formats:
+                parsed = _parse_with_formats(date_string, date_formats)
+            if parsed is None:
+                parsed = _parse_iso(date_string)
+        if parsed is None and self._relative_enabled:
+            offset = compile_relative_date(date_string)
+            # dateparser resolves relative expressions against the naive local time
+            parsed = offset.apply(self.settings.get('RELATIVE_BASE') or datetime.now()) if offset else None
+        if parsed is None:
+            data = self._get_data_parser().get_date_data(date_string, date_formats)
+            parsed = data['date_obj'] if data else None
+        return parsed
+
+    def with_relative_base(self, relative_base: datetime) -> 'DateParser':
+        """
+        Returns a copy of the parser resolving relative expressions against the given naive date, unless
+        the parser already has a fixed `RELATIVE_BASE` setting.
+
+        Args:
+            relative_base: Naive datetime used as the current time
+        """
+        if 'RELATIVE_BASE' in self.settings:
+            return self
+        return DateParser(languages=self.languages, locales=self.locales, region=self.region,
+                          settings={**self.settings, 'RELATIVE_BASE': relative_base}, date_formats=self.date_formats)
+
+    def warm_up(self) -> 'DateParser':
+        """
+        Imports `dateparser` and loads the data of configured languages up front, e.g. at a process start,
+        so the first parsed values do not pay the loading cost.
+
+        Returns:
+            The parser itself to allow chaining.
+        """
+        data_parser = self._get_data_parser()
+        for sample in ('1 January 2021', '5 days ago'):
+            data_parser.get_date_data(sample)
+        return self
+
+    def _get_data_parser(self):
+        if self._data_parser is None:
+            from dateparser.date import DateDataParser
+            self._data_parser = DateDataParser(languages=self.languages, locales=self.locales, region=self.region,
+                                               settings=self.settings or None)
+        return self._data_parser
+
+
+_DEFAULT_PARSER = DateParser()
+
+
+def parse_date(date_string: str, date_formats: Sequence[str] = None, parser: DateParser = None) -> Optional[datetime]:
+    """
+    Parses a date string, trying the cheap parsers first, see `DateParser.parse()`.
+
+    Args:
+        date_string: YYYY-MM-DD or relative string supported by date parser e.g. 5 days ago
+        date_formats: Optional list of `strptime` formats to try before falling back to `dateparser`
+        parser: Optional configured `DateParser`. Default: parser with `dateparser` default settings
+
+    Returns:
+        datetime or None if the string could not be parsed
+    """
+    return (parser or _DEFAULT_PARSER).parse(date_string, date_formats)
+
+
+def _parse_iso(date_string: str) -> Optional[datetime]:
+    if not _ISO_DATE_RE.fullmatch(date_string):
+        return None
+    try:
+        return datetime.fromisoformat(date_string)
+    except ValueError:
+        return None
+
+
+def _parse_with_formats(date_string: str, date_formats: Sequence[str]) -> Optional[datetime]:
+    for date_format in date_formats:
+        if not all(part.search(date_format) for part in _FORMAT_DATE_PARTS_RE):
+            continue
+        try:
+            parsed = datetime.strptime(date_string, date_format)
+        except ValueError:
+            continue
+        # dateparser drops parsed offsets, leave these to it
+        if parsed.tzinfo is None:
+            return parsed
+    return None
+
+
+DateCacheInfo = namedtuple('DateCacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class DateCache:
+    """
+    An opt-in, thread safe, bounded LRU cache of resolved date expressions.
+
+    Pass the same instance to `parse_datetime_interval()` / `get_past_date()` calls to resolve repeated
+    expressions only once. Results are keyed on the input values, the anchor date (`to_date` or the current time)
+    truncated to `granularity`, the timezone and the output format. Relative expressions therefore resolve to
+    the same value for the whole granularity window, e.g. `3 days ago` stays the same for one minute by default.
+
+    Usage example:
+
+        cache = DateCache(maxsize=512, granularity=timedelta(hours=1))
+        for table in tables:
+            start_date, end_date = parse_datetime_interval('5 days ago', 'today', cache=cache)
+        print(cache.cache_info())
+    """
+
+    def __init__(self, maxsize: int = 1024, granularity: timedelta = timedelta(minutes=1)):
+        """
+
+        Args:
+            maxsize: Maximum number of cached results, the least recently used are evicted first
+            granularity: Precision of the anchor date the results are keyed on
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive number")
+        if granularity <= timedelta(0):
+            raise ValueError("granularity must be a positive timedelta")
+
+        self.maxsize = maxsize
+        self.granularity = granularity
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def anchor_key(self, anchor: datetime = None) -> int:
+        """
+        Returns the anchor date (default: current time) truncated to the cache granularity.
+        """
+        if anchor is None:
+            anchor = datetime.now(timezone.utc)
+        return int(anchor.timestamp() // self.granularity.total_seconds())
+
+    def get_or_resolve(self, key: Hashable, resolve: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value of the key or resolves and stores it. Exceptions are not cached.
+
+        Args:
+            key: Hashable cache key
+            resolve: Function without arguments computing the value on a cache miss
+        """
+        with self._lock:
+            if key in self._data:
+                self._hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self._misses += 1
 
-def parse_datetime_interval(period_from: str, period_to: str, strformat: str = None) -> date_tuple:
+        value = resolve()
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def cache_info(self) -> DateCacheInfo:
+        """
+        Returns the hit / miss statistics of the cache.
+        """
+        with self._lock:
+            return DateCacheInfo(self._hits, self._misses, self._evictions, self.maxsize, len(self._data))
+
+    def clear(self):
+        """
+        Clears the cache and its statistics.
+        """
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+def parse_datetime_interval(period_from: str, period_to: str, strformat: str = None,
+                            date_formats: Sequence[str] = None, parser: DateParser = None,
+                            cache: DateCache = None) -> date_tuple:
     """
     Returns given period parameters in datetime format, or next step in back-fill mode
     along with generated last state for next iteration.
@@ -22,13 +394,21 @@ def parse_datetime_interval(period_from: str, period_to: str, strformat: str = N
         period_to: YYYY-MM-DD or relative string supported by date parser e.g. 5 days ago
         strformat: A python strtime format, in which output dates will be returned. If not specified
                     function returns dates in datetime.datetime type
+        date_formats: Optional list of `strptime` formats of the input values, tried before the generic parser
+        parser: Optional configured `DateParser` instance to use
+        cache: Optional `DateCache` instance to reuse results of previous calls
 
     Returns:
         start_date: datetime, end_date: datetime
     """
+    if cache is not None:
+        key = ('parse_datetime_interval', period_from, period_to, strformat, _formats_key(date_formats), parser,
+               cache.anchor_key())
+        return cache.get_or_resolve(key, lambda: parse_datetime_interval(period_from, period_to, strformat,
+                                                                         date_formats, parser))
 
-    start_date_form = dateparser.parse(period_from)
-    end_date_form = dateparser.parse(period_to)
+    start_date_form = parse_date(period_from, date_formats, parser)
+    end_date_form = parse_date(period_to, date_formats, parser)
     day_diff = (end_date_form - start_date_form).days
     if day_diff < 0:
         raise ValueError("start_date cannot exceed end_date.")
@@ -40,7 +420,8 @@ def parse_datetime_interval(period_from: str, period_to: str, strformat: str = N
 
 
 def get_past_date(str_days_ago: str, to_date: datetime = None,
-                  tz: pytz.tzinfo = pytz.utc) -> object:
+                  tz: tzinfo = None, date_formats: Sequence[str] = None, parser: DateParser = None,
+                  cache: DateCache = None) -> object:
     """
     Returns date in specified timezone relative to to_date parameter.
 
@@ -55,13 +436,28 @@ def get_past_date(str_days_ago: str, to_date: datetime = None,
     Args:
         str_days_ago: A string specifying some kind of date, in relative or absolute format
         to_date: A date, from which the relative date will be calculated. Default: today's date
-        tz: A timezone specifier of type pytz.tzinfo
+        tz: A timezone specifier of type pytz.tzinfo. Default: UTC
+        date_formats: Optional list of `strptime` formats of the input value, tried before the generic parser
+        parser: Optional configured `DateParser` instance to use
+        cache: Optional `DateCache` instance to reuse results of previous calls
 
     Returns:
         date: datetime
     """
+    if cache is not None:
+        # relative expressions resolve against the current time also when to_date is specified
+        to_date_key = cache.anchor_key(add_timezone_info(to_date, tz)) if to_date else None
+        key = ('get_past_date', str_days_ago, to_date_key, cache.anchor_key(), tz, _formats_key(date_formats), parser)
+        return cache.get_or_resolve(key, lambda: get_past_date(str_days_ago, to_date, tz, date_formats, parser))
+
+    tz = _utc_if_none(tz)
+    return _get_past_date(str_days_ago, to_date, tz, date_formats, parser, datetime.now(tz))
+
+
+def _get_past_date(str_days_ago: str, to_date: Optional[datetime], tz: tzinfo, date_formats: Optional[Sequence[str]],
+                   parser: Optional[DateParser], today_date: datetime) -> datetime:
+    from dateutil.relativedelta import relativedelta
 
-    today_date = datetime.now(tz)
     if not to_date:
         to_date = today_date
 
@@ -70,7 +466,7 @@ def get_past_date(str_days_ago: str, to_date: datetime = None,
 
     try:
         today_diff = (today_date.date() - to_date.date()).days
-        past_date = dateparser.parse(str_days_ago)
+        past_date = parse_date(str_days_ago, date_formats, parser)
         past_date = past_date.replace(tzinfo=tz)
         date = past_date - relativedelta(days=today_diff)
         return date
@@ -80,33 +476,217 @@ def get_past_date(str_days_ago: str, to_date: datetime = None,
             f"not in supported format. Raised: {e}")
 
 
-def add_timezone_info(to_date: datetime, tz: pytz.tzinfo = pytz.utc) -> datetime:
+DateBatchResult = namedtuple('DateBatchResult', ['input', 'result', 'error'])
+
+
+def parse_datetime_intervals(periods: Iterable[Tuple[str, str]], strformat: str = None,
+                             date_formats: Sequence[str] = None, parser: DateParser = None) -> List[DateBatchResult]:
+    """
+    Batch variant of `parse_datetime_interval()`.
+
+    All relative values are resolved against a single snapshot of the current time and each distinct pair
+    is parsed only once. An invalid pair does not stop the batch, its error is reported in the result.
+
+    Args:
+        periods: Sequence of (period_from, period_to) pairs
+        strformat: A python strtime format, in which output dates will be returned. If not specified
+                    function returns dates in datetime.datetime type
+        date_formats: Optional list of `strptime` formats of the input values, tried before the generic parser
+        parser: Optional configured `DateParser` instance to use
+
+    Returns:
+        List of `DateBatchResult(input, result, error)` in the input order. `result` is the
+        (start_date, end_date) tuple, or None if the pair failed with the `error` exception.
+    """
+    snapshot_parser = (parser or _DEFAULT_PARSER).with_relative_base(datetime.now())
+
+    def resolve(period):
+        return parse_datetime_interval(period[0], period[1], strformat, date_formats, snapshot_parser)
+
+    return _resolve_batch((tuple(period) for period in periods), resolve)
+
+
+def get_past_dates(expressions: Iterable[str], to_date: datetime = None, tz: tzinfo = None,
+                   date_formats: Sequence[str] = None, parser: DateParser = None) -> List[DateBatchResult]:
+    """
+    Batch variant of `get_past_date()`.
+
+    All values are resolved against a single snapshot of the current time and each distinct expression
+    is parsed only once. An invalid expression does not stop the batch, its error is reported in the result.
+
+    Args:
+        expressions: Sequence of strings specifying some kind of date, in relative or absolute format
+        to_date: A date, from which the relative dates will be calculated. Default: today's date
+        tz: A timezone specifier of type pytz.tzinfo. Default: UTC
+        date_formats: Optional list of `strptime` formats of the input values, tried before the generic parser
+        parser: Optional configured `DateParser` instance to use
+
+    Returns:
+        List of `DateBatchResult(input, result, error)` in the input order. `result` is the resolved datetime,
+        or None if the expression failed with the `error` exception.
+    """
+    tz = _utc_if_none(tz)
+    now = datetime.now(timezone.utc)
+    today_date = now.astimezone(tz)
+    snapshot_parser = (parser or _DEFAULT_PARSER).with_relative_base(now.astimezone().replace(tzinfo=None))
+
+    def resolve(expression):
+        return _get_past_date(expression, to_date, tz, date_formats, snapshot_parser, today_date)
+
+    return _resolve_batch(expressions, resolve)
+
+
+def _resolve_batch(inputs: Iterable[Hashable], resolve: Callable[[Any], Any]) -> List[DateBatchResult]:
+    resolved = {}
+    results = []
+    for value in inputs:
+        if value not in resolved:
+            try:
+                resolved[value] = DateBatchResult(value, resolve(value), None)
+            except Exception as e:
+                resolved[value] = DateBatchResult(value, None, e)
+        results.append(resolved[value])
+    return results
+
+
+def add_timezone_info(to_date: datetime, tz: tzinfo = None) -> datetime:
     """
     Add timezone info if not present. Useful when making sure the datetime instances are offset-aware to allow
     date subtracting.
     Args:
         to_date: datetime
-        tz: timezone
+        tz: timezone. Default: UTC
 
     Returns: datetime object with updated timezone info
 
     """
     if to_date.tzinfo is None:
-        to_date = to_date.replace(tzinfo=tz)
+        to_date = to_date.replace(tzinfo=_utc_if_none(tz))
 
     return to_date
 
 
+def _formats_key(date_formats: Sequence[str] = None) -> Optional[Tuple[str, ...]]:
+    return tuple(date_formats) if date_formats else None
+
+
+def _utc_if_none(tz: tzinfo = None) -> tzinfo:
+    """
+    Returns `pytz.utc` when no timezone is specified. Kept as a function so `pytz` is imported only when needed.
+    """
+    if tz is None:
+        import pytz
+        tz = pytz.utc
+    return tz
+
+
+class ChunkAlignment(ValidatingEnum):
+    """
+    Calendar periods the chunks of `split_dates_to_chunks` can be aligned to. Weeks start on Monday.
+    """
+    day = "day"
+    week = "week"
+    month = "month"
+    quarter = "quarter"
+    year = "year"
+
+
+_ALIGNMENT_MONTHS = {ChunkAlignment.month: 1, ChunkAlignment.quarter: 3, ChunkAlignment.year: 12}
+
+# positions of the numeric strftime directives in the `numpy.datetime_as_string` output `YYYY-MM-DDTHH:MM:SS.ffffff`
+_ISO_DIRECTIVE_SLICES = {'Y': (0, 4), 'm': (5, 7), 'd': (8, 10), 'H': (11, 13), 'M': (14, 16), 'S': (17, 19),
+                         'f': (20, 26)}
+_ISO_SEPARATORS = {4: '-', 7: '-', 10: 'T', 13: ':', 16: ':', 19: '.'}
+_ISO_STRING_LENGTH = 26
+
+
+class DateChunk(abc.Mapping):
+    """
+    A compact immutable date chunk holding the raw chunk dates.
+
+    It is a read-only mapping with the same keys as the chunk dictionaries (`start_date`, `end_date`), so
+    `chunk['start_date']` works as before. The dates are formatted on their first access and cached, so chunks that
+    are never read cost no `strftime` call. The raw dates are available as `start` and `end`.
+    """
+    __slots__ = ('_start', '_end', '_strformat', '_formatted_start', '_formatted_end')
+
+    def __init__(self, start: datetime, end: datetime, strformat: Optional[str] = "%Y-%m-%d"):
+        """
+
+        Args:
+            start: Start date of the chunk
+            end: End date of the chunk
+            strformat: A strftime format string of the mapping values, None to return the raw dates
+        """
+        self._start = start
+        self._end = end
+        self._strformat = strformat
+        self._formatted_start = None
+        self._formatted_end = None
+
+    @property
+    def start(self) -> datetime:
+        return self._start
+
+    @property
+    def end(self) -> datetime:
+        return self._end
+
+    @property
+    def strformat(self) -> Optional[str]:
+        return self._strformat
+
+    def __getitem__(self, key: str) -> Union[str, datetime]:
+        if key == 'start_date':
+            if self._formatted_start is None:
+                self._formatted_start = self._format(self._start)
+            return self._formatted_start
+        elif key == 'end_date':
+            if self._formatted_end is None:
+                self._formatted_end = self._format(self._end)
+            return self._formatted_end
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(('start_date', 'end_date'))
+
+    def __len__(self) -> int:
+        return 2
+
+    def __repr__(self):
+        return f"DateChunk({self._start!r}, {self._end!r}, {self._strformat!r})"
+
+    def _format(self, value: datetime) -> Union[str, datetime]:
+        return value if self._strformat is None else value.strftime(self._strformat)
+
+
 def split_dates_to_chunks(start_date: datetime, end_date: datetime, intv: int,
-                          strformat: str = "%Y-%m-%d", generator: bool = False) -> date_chunk:
+                          strformat: str = "%Y-%m-%d", generator: bool = False,
+                          align: Union[ChunkAlignment, str] = None, vectorized: bool = False,
+                          compact: bool = False) -> date_chunk:
     """
     Splits dates in given period into chunks of specified max size.
 
+    By default the period is split into equal parts of at most `intv` days (or into single days if `intv` is 0).
+    With `align`, the chunks are aligned to calendar periods instead: each chunk spans `intv` whole periods
+    (at least one), except the first and the last one, which are cut by the `start_date` and `end_date`. The end
+    of a chunk is the start of the next one.
+
+    Each chunk boundary is formatted only once. With `vectorized=True`, all boundaries are computed at once as
+    NumPy `datetime64` arrays and formats consisting of numeric directives (`%Y %m %d %H %M %S %f`) and ASCII
+    literals are formatted in bulk, which is considerably faster for plans with many chunks. It requires `numpy`
+    (`pip install keboola.utils[numpy]`) and gives the same chunks as the default backend, timezones included.
+
     Args:
         start_date: Start date, from which periods will be calculated
         end_date: End date, to which periods will be calculated
-        intv: Size of interval in days
+        intv: Size of interval in days, or in calendar periods if `align` is set
         strformat: A strftime format string
+        generator: Return a generator instead of a list
+        align: Align chunks to calendar periods: day, week, month, quarter or year
+        vectorized: Compute and format the chunks using NumPy
+        compact: Return `DateChunk` objects holding the raw dates, formatted only when accessed, instead of
+            dictionaries. They take a fraction of the memory and time for large plans.
 
     Returns:
         list
@@ -116,30 +696,517 @@ def split_dates_to_chunks(start_date: datetime, end_date: datetime, intv: int,
 
         returns [{start_date: "2018-01-01", "end_date":"2018-01-02"}
                  {start_date: "2018-01-02", "end_date":"2018-01-04"}]
+
+    split_dates_to_chunks(datetime(2021, 1, 15), datetime(2021, 3, 10), 1, align="month")
+
+        returns [{start_date: "2021-01-15", "end_date":"2021-02-01"}
+                 {start_date: "2021-02-01", "end_date":"2021-03-01"}
+                 {start_date: "2021-03-01", "end_date":"2021-03-10"}]
+    """
+    if align is not None:
+        try:
+            align = ChunkAlignment.get_by_name(align)
+        except TypeError:
+            raise ValueError(f"Chunk alignment '{align}' not supported, use one of {ChunkAlignment.list()}")
+
+    if vectorized:
+        _gen = iter(_split_dates_to_chunks_vectorized(start_date, end_date, intv, strformat, align, compact))
+    else:
+        _gen = _split_dates_to_chunks_gen(start_date, end_date, intv, strformat, align, compact)
+
+    if generator is True:
+        return (chunk for chunk in _gen)
+    else:
+        return list(_gen)
+
+
+class ChunkSequence(abc.Sequence):
+    """
+    A lazy, random access sequence of date chunks of a fixed size, e.g. for splitting a backfill plan between
+    workers without materializing it.
+
+    The chunk `i` starts at `start_date + i * interval` and ends at the start of the next chunk, the last chunk
+    is cut by the `end_date`. Chunks are computed on access, so the memory used does not depend on the number
+    of chunks. Supports `len()`, indexing, slicing (returning a `ChunkSequence`) and reverse iteration.
+
+    Usage example:
+    plan = ChunkSequence(datetime(2021, 1, 1), datetime(2021, 1, 2), timedelta(minutes=15), "%Y-%m-%d %H:%M")
+    len(plan)  # 96
+    plan[-1]  # {'start_date': '2021-01-01 23:45', 'end_date': '2021-01-02 00:00'}
+    worker_chunks = plan[worker_id::nr_workers]
+    """
+    __slots__ = ('start_date', 'end_date', 'interval', 'strformat', 'compact', '_indices')
+
+    def __init__(self, start_date: datetime, end_date: datetime, interval: Union[timedelta, int],
+                 strformat: Optional[str] = "%Y-%m-%d", compact: bool = False, _indices: range = None):
+        """
+
+        Args:
+            start_date: Start date of the first chunk
+            end_date: End date of the last chunk
+            interval: Size of the chunks, `int` stands for a number of days. Must be whole days for `date` inputs
+            strformat: A strftime format string of the chunk dates, None to return the datetime objects
+            compact: Return `DateChunk` objects formatting the dates on access instead of dictionaries
+        """
+        if not isinstance(interval, timedelta):
+            interval = timedelta(days=interval)
+        if interval <= timedelta(0):
+            raise ValueError(f"Chunk interval must be positive, got {interval}")
+        if not isinstance(start_date, datetime) and interval % timedelta(days=1):
+            raise ValueError(f"Chunk interval of dates must be a whole number of days, got {interval}")
+        if end_date < start_date:
+            raise ValueError(f"End date {end_date} is before the start date {start_date}")
+
+        self.start_date = start_date
+        self.end_date = end_date
+        self.interval = interval
+        self.strformat = strformat
+        self.compact = compact
+        if _indices is None:
+            # a period shorter than the interval (even an empty one) is a single chunk
+            _indices = range(max(math.ceil((end_date - start_date) / interval), 1))
+        self._indices = _indices
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Mapping[str, Any], 'ChunkSequence']:
+        if isinstance(index, slice):
+            return ChunkSequence(self.start_date, self.end_date, self.interval, self.strformat, self.compact,
+                                 _indices=self._indices[index])
+        return self._chunk(self._indices[index])
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        return map(self._chunk, self._indices)
+
+    def __reversed__(self) -> Iterator[Mapping[str, Any]]:
+        return map(self._chunk, reversed(self._indices))
+
+    def __repr__(self):
+        return (f"ChunkSequence({self.start_date!r}, {self.end_date!r}, {self.interval!r}, {self.strformat!r}, "
+                f"{self.compact!r}, {self._indices!r})")
+
+    def _chunk(self, position: int) -> Mapping[str, Any]:
+        chunk_start = self.start_date + self.interval * position
+        chunk_end = min(chunk_start + self.interval, self.end_date)
+        if self.compact:
+            return DateChunk(chunk_start, chunk_end, self.strformat)
+        elif self.strformat is None:
+            return {'start_date': chunk_start, 'end_date': chunk_end}
+        return {'start_date': chunk_start.strftime(self.strformat), 'end_date': chunk_end.strftime(self.strformat)}
+
+
+ChunkFeedback = namedtuple('ChunkFeedback', ['elapsed', 'size', 'error'], defaults=(None, None, None))
+
+
+def split_dates_to_adaptive_chunks(start_date: datetime, end_date: datetime, intv: Union[timedelta, int],
+                                   min_intv: Union[timedelta, int], max_intv: Union[timedelta, int],
+                                   target_duration: Union[float, timedelta] = None, target_size: float = None,
+                                   max_growth: float = 2.0, resolution: Optional[timedelta] = timedelta(seconds=1),
+                                   strformat: str = "%Y-%m-%d", compact: bool = False
+                                   ) -> Generator[Optional[Mapping[str, Any]], Optional[ChunkFeedback], None]:
+    """
+    Splits dates into chunks whose size adapts to the feedback about the processed chunks.
+
+    The first chunk spans `intv`. After processing a chunk, send its `ChunkFeedback` (elapsed seconds, size in rows
+    or bytes, error) to the generator and the following chunks are resized towards the `target_duration` and / or
+    `target_size` (the smaller of both estimates is used), by at most `max_growth` times per chunk and within
+    `min_intv` and `max_intv`. A chunk reported with an error is planned again with the size divided
+    by `max_growth`; if it already had the minimal size, the error is raised. Without feedback the size is kept.
+
+    Sending the feedback only acknowledges it (`send()` returns None) and does not advance the generator,
+    so the planner can be used in a for loop:
+
+        planner = split_dates_to_adaptive_chunks(start, end, timedelta(days=1), timedelta(hours=1),
+                                                 timedelta(days=30), target_duration=60, strformat="%Y-%m-%d %H:%M")
+        for chunk in planner:
+            started = time.monotonic()
+            try:
+                rows = extract(chunk)
+            except TimeoutError as e:
+                planner.send(ChunkFeedback(error=e))
+            else:
+                planner.send(ChunkFeedback(elapsed=time.monotonic() - started, size=rows))
+
+    Args:
+        start_date: Start date of the first chunk
+        end_date: End date of the last chunk
+        intv: Initial size of the chunks, `int` stands for a number of days
+        min_intv: Minimal size of the chunks
+        max_intv: Maximal size of the chunks
+        target_duration: Desired processing time of a chunk in seconds
+        target_size: Desired size of a chunk in the units reported in the feedback, e.g. rows
+        max_growth: Maximal factor by which the size grows or shrinks from one chunk to the next
+        resolution: Chunk sizes are rounded down to a multiple of the resolution, None to keep them exact
+        strformat: A strftime format string of the chunk dates
+        compact: Return `DateChunk` objects instead of dictionaries
+
+    Returns:
+        Generator of chunks accepting `ChunkFeedback`
     """
+    intv, min_intv, max_intv = (value if isinstance(value, timedelta) else timedelta(days=value)
+                                for value in (intv, min_intv, max_intv))
+    if not timedelta(0) < min_intv <= max_intv:
+        raise ValueError(f"Invalid chunk size bounds: min_intv {min_intv}, max_intv {max_intv}")
+    if target_duration is None and target_size is None:
+        raise ValueError("Specify target_duration or target_size")
+    if max_growth <= 1:
+        raise ValueError(f"max_growth must be greater than 1, got {max_growth}")
+    if isinstance(target_duration, timedelta):
+        target_duration = target_duration.total_seconds()
+
+    sizing = _AdaptiveSizing(min_intv, max_intv, target_duration, target_size, max_growth, resolution)
+    return _split_dates_to_adaptive_chunks_gen(start_date, end_date, sizing.clamp(intv), sizing, strformat, compact)
 
-    def split_dates_to_chunks_gen(start_date, end_date, intv, strformat):
 
-        nr_days = (end_date - start_date).days
+class _AdaptiveSizing:
 
-        if nr_days <= intv:
-            yield {'start_date': start_date.strftime(strformat),
-                   'end_date': end_date.strftime(strformat)}
-        elif intv == 0:
-            diff = timedelta(days=1)
-            for i in range(nr_days):
-                yield {'start_date': (start_date + diff * i).strftime(strformat),
-                       'end_date': (start_date + diff * i).strftime(strformat)}
+    def __init__(self, min_intv: timedelta, max_intv: timedelta, target_duration: Optional[float],
+                 target_size: Optional[float], max_growth: float, resolution: Optional[timedelta]):
+        self.min_intv = min_intv
+        self.max_intv = max_intv
+        self.target_duration = target_duration
+        self.target_size = target_size
+        self.max_growth = max_growth
+        self.resolution = resolution
+
+    def clamp(self, interval: timedelta) -> timedelta:
+        if self.resolution:
+            interval -= interval % self.resolution
+        return max(self.min_intv, min(self.max_intv, interval))
+
+    def resize(self, chunk_size: timedelta, feedback: ChunkFeedback) -> timedelta:
+        factors = []
+        elapsed = feedback.elapsed
+        if isinstance(elapsed, timedelta):
+            elapsed = elapsed.total_seconds()
+        if self.target_duration is not None and elapsed is not None:
+            factors.append(self.target_duration / elapsed if elapsed > 0 else self.max_growth)
+        if self.target_size is not None and feedback.size is not None:
+            factors.append(self.target_size / feedback.size if feedback.size > 0 else self.max_growth)
+        factor = min(factors) if factors else 1
+        factor = min(max(factor, 1 / self.max_growth), self.max_growth)
+        return self.clamp(chunk_size * factor)
+
+
+def _split_dates_to_adaptive_chunks_gen(start_date: datetime, end_date: datetime, interval: timedelta,
+                                        sizing: _AdaptiveSizing, strformat: str, compact: bool):
+    position = start_date
+    while True:
+        chunk_end = min(position + interval, end_date)
+        if compact:
+            chunk = DateChunk(position, chunk_end, strformat)
         else:
-            nr_parts = math.ceil(nr_days / intv)
-            diff = (end_date - start_date) / nr_parts
-            for i in range(nr_parts):
-                yield {'start_date': (start_date + diff * i).strftime(strformat),
-                       'end_date': (start_date + diff * (i + 1)).strftime(strformat)}
+            chunk = {'start_date': position.strftime(strformat), 'end_date': chunk_end.strftime(strformat)}
+        feedback = yield chunk
+        failed = False
+        while feedback is not None:
+            failed = feedback.error is not None
+            if failed:
+                if chunk_end - position <= sizing.min_intv:
+                    error = feedback.error
+                    if not isinstance(error, BaseException):
+                        error = ValueError(f"Chunk {chunk} failed with the minimal size: {error}")
+                    raise error
+                interval = sizing.clamp((chunk_end - position) / sizing.max_growth)
+            else:
+                interval = sizing.resize(chunk_end - position, feedback)
+            feedback = yield None
+        if not failed:
+            position = chunk_end
+        if position >= end_date:
+            return
 
-    _gen = split_dates_to_chunks_gen(start_date, end_date, intv, strformat)
 
-    if generator is True:
-        return _gen
+def split_dates_by_weight(start_date: datetime, end_date: datetime, weights: Sequence[float],
+                          bucket: Union[timedelta, int] = 1, nr_chunks: int = None, max_weight: float = None,
+                          strformat: str = "%Y-%m-%d", compact: bool = False) -> List[Mapping[str, Any]]:
+    """
+    Splits dates into contiguous chunks of balanced weight, e.g. the number of rows, instead of balanced length.
+
+    The period is divided into buckets of the `bucket` size, `weights[i]` is the weight of the bucket starting
+    at `start_date + i * bucket` (the last bucket is cut by the `end_date`). Chunk boundaries are always bucket
+    boundaries. Either `nr_chunks` chunks are returned, each ending at the bucket boundary closest to its share
+    of the total weight, or as few chunks as possible with the weight at most `max_weight` (a single bucket
+    heavier than `max_weight` forms a chunk of its own). The plan takes O(n + k log n) time for n buckets and k
+    chunks. If all the weights are zero, the buckets are split evenly into `nr_chunks` chunks, or form a single
+    chunk with `max_weight`.
+
+    Args:
+        start_date: Start date of the first chunk
+        end_date: End date of the last chunk
+        weights: Non-negative weights of the buckets, e.g. row counts from a metadata query
+        bucket: Size of the buckets, `int` stands for a number of days
+        nr_chunks: Number of chunks to split the dates into, at most the number of buckets
+        max_weight: Maximal weight of a chunk, alternative to `nr_chunks`
+        strformat: A strftime format string
+        compact: Return `DateChunk` objects instead of dictionaries
+
+    Returns:
+        list
+
+    Usage example:
+    split_dates_by_weight(datetime(2021, 1, 1), datetime(2021, 1, 5), [1, 1, 2, 4], nr_chunks=2)
+
+        returns [{start_date: "2021-01-01", "end_date":"2021-01-04"}
+                 {start_date: "2021-01-04", "end_date":"2021-01-05"}]
+    """
+    if (nr_chunks is None) == (max_weight is None):
+        raise ValueError("Specify either nr_chunks or max_weight")
+    bucket = bucket if isinstance(bucket, timedelta) else timedelta(days=bucket)
+    if bucket <= timedelta(0):
+        raise ValueError(f"The bucket size must be positive, got {bucket}")
+    nr_full_buckets, remainder = divmod(end_date - start_date, bucket)
+    nr_buckets = nr_full_buckets + bool(remainder)
+    if len(weights) != nr_buckets:
+        raise ValueError(f"Expected {nr_buckets} weights of {bucket} buckets, got {len(weights)}")
+
+    if nr_buckets and min(weights) < 0:
+        raise ValueError("The weights must be non-negative")
+    prefix_sums = [0, *accumulate(weights)]
+
+    if nr_chunks is not None:
+        if not 0 < nr_chunks <= max(nr_buckets, 1):
+            raise ValueError(f"nr_chunks must be between 1 and the number of buckets ({nr_buckets}), got {nr_chunks}")
+        if not prefix_sums[-1]:
+            prefix_sums = range(nr_buckets + 1)
+        indices = _balanced_indices(prefix_sums, nr_chunks)
     else:
-        return list(_gen)
+        if max_weight <= 0:
+            raise ValueError(f"max_weight must be positive, got {max_weight}")
+        indices = _bounded_indices(prefix_sums, max_weight)
+
+    boundaries = [start_date + bucket * index for index in indices[:-1]]
+    boundaries.append(end_date)
+    if compact:
+        return [DateChunk(chunk_start, chunk_end, strformat) for chunk_start, chunk_end in zip(boundaries,
+                                                                                               boundaries[1:])]
+    formatted = [boundary.strftime(strformat) for boundary in boundaries]
+    return [{'start_date': chunk_start, 'end_date': chunk_end} for chunk_start, chunk_end in zip(formatted,
+                                                                                                 formatted[1:])]
+
+
+def _balanced_indices(prefix_sums: Sequence[float], nr_chunks: int) -> List[int]:
+    nr_buckets = len(prefix_sums) - 1
+    indices = [0]
+    for i in range(1, nr_chunks):
+        target = prefix_sums[-1] * i / nr_chunks
+        # keep at least one bucket for each of the remaining chunks
+        low, high = indices[-1] + 1, nr_buckets - nr_chunks + i
+        index = bisect_left(prefix_sums, target, low, high)
+        if index > low and target - prefix_sums[index - 1] < prefix_sums[index] - target:
+            index -= 1
+        indices.append(index)
+    indices.append(nr_buckets)
+    return indices
+
+
+def _bounded_indices(prefix_sums: Sequence[float], max_weight: float) -> List[int]:
+    nr_buckets = len(prefix_sums) - 1
+    indices = [0]
+    while indices[-1] < nr_buckets:
+        start = indices[-1]
+        end = bisect_right(prefix_sums, prefix_sums[start] + max_weight, start + 1) - 1
+        indices.append(max(end, start + 1))
+    return indices if nr_buckets else [0, 0]
+
+
+def _split_dates_to_chunks_gen(start_date: datetime, end_date: datetime, intv: int, strformat: str,
+                               align: Optional[ChunkAlignment], compact: bool = False) -> date_gen:
+    nr_days = (end_date - start_date).days
+
+    if align is None and intv == 0 and nr_days > 0:
+        diff = timedelta(days=1)
+        for i in range(nr_days):
+            if compact:
+                day = start_date + diff * i
+                yield DateChunk(day, day, strformat)
+            else:
+                day = (start_date + diff * i).strftime(strformat)
+                yield {'start_date': day, 'end_date': day}
+        return
+
+    boundaries = _chunk_boundaries(start_date, end_date, intv, nr_days, align)
+    if compact:
+        chunk_start = next(boundaries)
+        for boundary in boundaries:
+            yield DateChunk(chunk_start, boundary, strformat)
+            chunk_start = boundary
+        return
+
+    chunk_start = next(boundaries).strftime(strformat)
+    for boundary in boundaries:
+        chunk_end = boundary.strftime(strformat)
+        yield {'start_date': chunk_start, 'end_date': chunk_end}
+        chunk_start = chunk_end
+
+
+def _chunk_boundaries(start_date: datetime, end_date: datetime, intv: int, nr_days: int,
+                      align: Optional[ChunkAlignment]) -> Iterator[datetime]:
+    """
+    Yields the start of the first chunk followed by the ends of all chunks.
+    """
+    yield start_date
+    if align is not None:
+        for boundary in _aligned_boundaries(start_date, max(intv, 1), align):
+            if boundary >= end_date:
+                break
+            yield boundary
+    elif nr_days > intv:
+        nr_parts = math.ceil(nr_days / intv)
+        diff = (end_date - start_date) / nr_parts
+        for i in range(1, nr_parts):
+            yield start_date + diff * i
+        # the end of the last chunk is kept the same as in previous versions
+        yield start_date + diff * nr_parts
+        return
+    yield end_date
+
+
+def _aligned_boundaries(start_date: datetime, periods: int, align: ChunkAlignment) -> Iterator[datetime]:
+    """
+    Yields the calendar period boundaries following the `start_date`, `periods` calendar periods apart.
+    """
+    day_start = start_date
+    if isinstance(start_date, datetime):
+        day_start = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    if align in _ALIGNMENT_MONTHS:
+        step = _ALIGNMENT_MONTHS[align]
+        month_index = (start_date.year * 12 + start_date.month - 1) // step * step
+        while True:
+            month_index += step * periods
+            year, month = divmod(month_index, 12)
+            yield day_start.replace(year=year, month=month + 1, day=1)
+    else:
+        boundary = day_start
+        if align == ChunkAlignment.week:
+            boundary -= timedelta(days=start_date.weekday())
+        diff = timedelta(days=periods * (7 if align == ChunkAlignment.week else 1))
+        while True:
+            boundary += diff
+            yield boundary
+
+
+def _split_dates_to_chunks_vectorized(start_date: datetime, end_date: datetime, intv: int, strformat: str,
+                                      align: Optional[ChunkAlignment], compact: bool = False) -> List[Mapping]:
+    import numpy
+
+    tz = getattr(start_date, 'tzinfo', None)
+    start = numpy.datetime64(_wall_clock(start_date), 'us')
+    # the end in the wall clock of the start, the computed boundaries carry the tzinfo of the start
+    end = numpy.datetime64(_wall_clock(start_date) + (end_date - start_date), 'us')
+    nr_days = (end_date - start_date).days
+
+    if align is None and intv == 0 and nr_days > 0:
+        days = start + numpy.arange(nr_days) * numpy.timedelta64(1, 'D')
+        if compact:
+            return [DateChunk(day, day, strformat) for day in _datetime64_to_python(days, start_date)]
+        days = _format_datetime64(days, strformat, tz)
+        return [{'start_date': day, 'end_date': day} for day in days]
+
+    if align is not None:
+        periods = max(intv, 1)
+        if align in _ALIGNMENT_MONTHS:
+            month_step = _ALIGNMENT_MONTHS[align]
+            month_index = (start_date.year * 12 + start_date.month - 1) // month_step * month_step
+            first = numpy.datetime64(month_index - 1970 * 12, 'M')
+            step = numpy.timedelta64(month_step * periods, 'M')
+            inner = numpy.arange(first + step, end.astype('datetime64[M]') + step, step)
+        else:
+            step = numpy.timedelta64(periods * (7 if align == ChunkAlignment.week else 1), 'D')
+            first = start.astype('datetime64[D]')
+            if align == ChunkAlignment.week:
+                first -= numpy.timedelta64(start_date.weekday(), 'D')
+            inner = numpy.arange(first + step, end.astype('datetime64[D]') + step, step)
+        inner = inner.astype('datetime64[us]')
+        boundaries = numpy.concatenate(([start], inner[inner < end]))
+        last = end_date
+    elif nr_days > intv:
+        nr_parts = math.ceil(nr_days / intv)
+        diff = numpy.timedelta64((end_date - start_date) / nr_parts, 'us')
+        boundaries = start + numpy.arange(nr_parts + 1) * diff
+        if not isinstance(start_date, datetime):
+            # `date` arithmetic drops the time part of the offsets
+            boundaries = boundaries.astype('datetime64[D]')
+        last = None
+    else:
+        boundaries = numpy.array([start])
+        last = end_date
+
+    # as in the default backend, the `end_date` itself ends the last chunk, in its own timezone
+    if compact:
+        values = _datetime64_to_python(boundaries, start_date)
+        if last is not None:
+            values.append(last)
+        return [DateChunk(chunk_start, chunk_end, strformat) for chunk_start, chunk_end in zip(values, values[1:])]
+    formatted = _format_datetime64(boundaries, strformat, tz)
+    if last is not None:
+        formatted.append(last.strftime(strformat))
+    return [{'start_date': chunk_start, 'end_date': chunk_end}
+            for chunk_start, chunk_end in zip(formatted, formatted[1:])]
+
+
+def _wall_clock(value: Union[datetime, date]) -> Union[datetime, date]:
+    return value.replace(tzinfo=None) if isinstance(value, datetime) else value
+
+
+def _datetime64_to_python(values, like: Union[datetime, date]) -> List[Union[datetime, date]]:
+    """
+    Converts datetime64 values to objects of the same type and timezone as `like`.
+    """
+    if not isinstance(like, datetime):
+        return values.astype('datetime64[D]').tolist()
+    values = values.astype('datetime64[us]').tolist()
+    if like.tzinfo is not None:
+        values = [value.replace(tzinfo=like.tzinfo) for value in values]
+    return values
+
+
+def _format_datetime64(values, strformat: str, tz: Optional[tzinfo]) -> List[str]:
+    """
+    Formats datetime64 values in bulk by gathering the bytes of their ISO representation, see
+    `_compile_iso_layout()`. Other formats are formatted with `strftime`.
+    """
+    import numpy
+
+    layout = _compile_iso_layout(strformat)
+    if layout is None or not len(values) or values.min() < numpy.datetime64('1000-01-01'):
+        return [value.replace(tzinfo=tz).strftime(strformat) for value in values.astype('datetime64[us]').tolist()]
+
+    iso = numpy.datetime_as_string(values.astype('datetime64[us]'), unit='us')
+    if layout == tuple(range(len(layout))):
+        # a prefix of the ISO representation, e.g. `%Y-%m-%d`
+        return iso.astype(f'U{len(layout)}').tolist()
+    iso = iso.astype(f'S{_ISO_STRING_LENGTH}')
+    iso_bytes = iso.view(numpy.uint8).reshape(-1, _ISO_STRING_LENGTH)
+    formatted = numpy.empty((len(values), len(layout)), dtype=numpy.uint8)
+    for position, source in enumerate(layout):
+        if isinstance(source, int):
+            formatted[:, position] = iso_bytes[:, source]
+        else:
+            formatted[:, position] = ord(source)
+    return formatted.view(f'S{len(layout)}').ravel().astype(str).tolist()
+
+
+@lru_cache(maxsize=128)
+def _compile_iso_layout(strformat: str) -> Optional[Tuple[Union[int, str], ...]]:
+    """
+    Compiles a strftime format into a layout of the formatted string: for each character either its position
+    in the ISO representation of the value (separators following a directive included), or the literal
+    character. Returns None if the format contains a non-numeric directive or a non-ASCII literal.
+    """
+    layout = []
+    parts = iter(strformat)
+    for char in parts:
+        if char == '%':
+            directive = next(parts, None)
+            if directive in _ISO_DIRECTIVE_SLICES:
+                layout.extend(range(*_ISO_DIRECTIVE_SLICES[directive]))
+                continue
+            elif directive != '%':
+                return None
+        if not char.isascii():
+            return None
+        next_position = layout[-1] + 1 if layout and isinstance(layout[-1], int) else None
+        layout.append(next_position if _ISO_SEPARATORS.get(next_position) == char else char)
+    return tuple(layout) if layout else None
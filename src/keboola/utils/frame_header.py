@@ -0,0 +1,77 @@
+"""
+Column normalization of pandas DataFrames and Arrow tables.
+
+Only the column metadata is replaced, the data buffers are shared with the input object and are never copied.
+
+`pandas` and `pyarrow` are optional dependencies, they are not imported by this module and are required only
+for the objects passed in:
+
+    pip install keboola.utils[pandas]
+    pip install keboola.utils[arrow]
+
+"""
+
+from typing import Any, List
+
+from .header_normalizer import HeaderNormalizer
+
+
+def normalize_dataframe_columns(data_frame: Any, normalizer: HeaderNormalizer, inplace: bool = False) -> Any:
+    """
+    Normalizes columns of a pandas DataFrame without copying its data.
+
+    Args:
+        data_frame: pandas DataFrame
+        normalizer: Header normalizer applied to the column names, e.g. from `get_normalizer()`
+        inplace: If True, the columns of the input DataFrame are replaced, otherwise a shallow copy sharing
+                 the data with the input DataFrame is returned
+
+    Returns:
+        DataFrame with normalized columns
+
+    Raises:
+        ValueError: If the DataFrame has multi-level columns
+    """
+    if getattr(data_frame.columns, 'nlevels', 1) > 1:
+        raise ValueError("Multi-level columns are not supported, flatten the columns first.")
+    normalized_columns = _normalize_names(data_frame.columns, normalizer)
+    result = data_frame if inplace else data_frame.copy(deep=False)
+    result.columns = normalized_columns
+    return result
+
+
+def normalize_arrow_schema(schema: Any, normalizer: HeaderNormalizer) -> Any:
+    """
+    Normalizes top level field names of an Arrow schema. Field types, nullability and metadata are kept.
+
+    Args:
+        schema: pyarrow Schema
+        normalizer: Header normalizer applied to the field names, e.g. from `get_normalizer()`
+
+    Returns:
+        New pyarrow Schema with normalized field names
+    """
+    import pyarrow
+
+    normalized_names = _normalize_names(schema.names, normalizer)
+    fields = [field.with_name(name) for field, name in zip(schema, normalized_names)]
+    return pyarrow.schema(fields, metadata=schema.metadata)
+
+
+def normalize_arrow_table(table: Any, normalizer: HeaderNormalizer) -> Any:
+    """
+    Normalizes column names of an Arrow Table or RecordBatch without copying its data. The schema metadata
+    and field attributes are kept.
+
+    Args:
+        table: pyarrow Table or RecordBatch
+        normalizer: Header normalizer applied to the column names, e.g. from `get_normalizer()`
+
+    Returns:
+        New pyarrow Table or RecordBatch with normalized column names sharing buffers with the input
+    """
+    return type(table).from_arrays(table.columns, schema=normalize_arrow_schema(table.schema, normalizer))
+
+
+def _normalize_names(names, normalizer: HeaderNormalizer) -> List[str]:
+    return normalizer.normalize_header([str(name) for name in names])
@@ -7,11 +7,18 @@ Underscore is not allowed on the beginning.`
 
 """
 
+import gzip
+import json
+import os
 import re
 import string
+import tempfile
+import unicodedata
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from enum import Enum
-from typing import List, Tuple, Union
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple, Union
 
 from .char_encoder import CharEncoder, SupportedEncoder
 
@@ -21,6 +28,17 @@ DEFAULT_WHITESPACE_SUB = "_"
 DEFAULT_NON_PERMITTED_SUB = ""
 DEFAULT_ENCODE_DELIM = "_"
 DEFAULT_ENCODER = SupportedEncoder.unicode
+# encoders whose codes consist of letters and cannot be told apart from words in the normalized names
+UNDECODABLE_ENCODERS = frozenset({SupportedEncoder.hex, SupportedEncoder.utf8_hex, SupportedEncoder.base36})
+DEFAULT_CACHE_SIZE = 100_000
+
+# letters without a canonical or compatibility decomposition to ASCII
+TRANSLITERATION_OVERRIDES = {
+    'ß': 'ss', 'ẞ': 'SS', 'æ': 'ae', 'Æ': 'AE', 'œ': 'oe', 'Œ': 'OE', 'ø': 'o', 'Ø': 'O', 'đ': 'd', 'Đ': 'D',
+    'ð': 'd', 'Ð': 'D', 'þ': 'th', 'Þ': 'TH', 'ł': 'l', 'Ł': 'L', 'ħ': 'h', 'Ħ': 'H', 'ı': 'i', 'ŀ': 'l',
+    'Ŀ': 'L', 'ŧ': 't', 'Ŧ': 'T', 'ŋ': 'ng', 'Ŋ': 'NG', 'ĸ': 'k', 'ſ': 's', 'ƒ': 'f', 'µ': 'u', 'º': 'o',
+    'ª': 'a'
+}
 
 
 class HeaderNormalizer(ABC):
@@ -29,15 +47,19 @@ class HeaderNormalizer(ABC):
 
     """
 
-    def __init__(self, permitted_chars: str = PERMITTED_CHARS, whitespace_sub: str = DEFAULT_WHITESPACE_SUB):
+    def __init__(self, permitted_chars: str = PERMITTED_CHARS, whitespace_sub: str = DEFAULT_WHITESPACE_SUB,
+                 resolve_duplicates: bool = False):
         """
 
         Args:
             permitted_chars: all characters that are permitted to be in a column concatenated together in one string
             whitespace_sub: character to substitute a whitespace
+            resolve_duplicates: make the normalized column names unique, see `normalize_header()`
         """
 
+        self.resolve_duplicates = resolve_duplicates
         self.permitted_chars = permitted_chars
+        self._permitted_set = frozenset(permitted_chars)
         self.whitespace_sub = whitespace_sub
         self._check_chars_permitted(self.whitespace_sub)
 
@@ -45,6 +67,14 @@ class HeaderNormalizer(ABC):
     def _normalize_column_name(self, column_name: str):
         pass
 
+    def get_config(self) -> dict:
+        """
+        Returns the configuration that determines the normalized names, e.g. to key cached normalizations.
+
+        """
+        return {'normalizer': type(self).__name__, 'permitted_chars': self.permitted_chars,
+                'whitespace_sub': self.whitespace_sub}
+
     def _check_chars_permitted(self, in_string: str):
         """
         Checks whether characters of a string are within a permitted characters string
@@ -61,7 +91,7 @@ class HeaderNormalizer(ABC):
         """
 
         for char in in_string:
-            if char not in self.permitted_chars:
+            if char not in self._permitted_set:
                 raise ValueError(f"Substitute: '{in_string}' not in permitted characters")
 
     def _replace_whitespace(self, in_string: str) -> str:
@@ -87,6 +117,10 @@ class HeaderNormalizer(ABC):
 
         It also checks for empty headers and adds a name to them so they do not remain empty
 
+        If the normalizer was created with `resolve_duplicates=True`, names that collide after normalization
+        (e.g. `a#b` and `ab`) are made unique: the first occurrence keeps the name, the following ones get
+        a deterministic `_<N>` suffix. Neither the suffixed nor the `empty_<N>` names clash with any other column.
+
         Args:
             header:
 
@@ -95,6 +129,9 @@ class HeaderNormalizer(ABC):
 
         """
 
+        if self.resolve_duplicates:
+            return self._normalize_header_unique(header)
+
         normalized_header = []
         empty_column_id = 1
 
@@ -104,6 +141,49 @@ class HeaderNormalizer(ABC):
             normalized_header.append(column)
         return normalized_header
 
+    def get_mapping(self, header: List[str]) -> 'HeaderMapping':
+        """
+        Normalizes the header and returns a bidirectional mapping between the original and normalized names.
+
+        Args:
+            header:
+
+        Returns:
+            HeaderMapping
+        """
+        return HeaderMapping(header, self.normalize_header(header))
+
+    def _normalize_header_unique(self, header: List[str]) -> List[str]:
+        """
+        Normalizes the header and resolves duplicate names in linear time. All normalized names are reserved
+        first, generated names skip the reserved ones; the next suffix of each name is remembered, so the suffixes
+        are not searched from the start again.
+
+        """
+
+        normalized_header = [self._normalize_column_name(column) for column in header]
+        taken = set(normalized_header)
+        emitted = set()
+        next_suffix = {}
+        empty_column_id = 1
+
+        for i, column in enumerate(normalized_header):
+            if not column:
+                column, empty_column_id = self._check_empty_column(column, empty_column_id)
+                while column in taken:
+                    column, empty_column_id = self._check_empty_column('', empty_column_id)
+                taken.add(column)
+            elif column in emitted:
+                suffix = next_suffix.get(column, 1)
+                while f"{column}_{suffix}" in taken:
+                    suffix += 1
+                next_suffix[column] = suffix + 1
+                column = f"{column}_{suffix}"
+                taken.add(column)
+            emitted.add(column)
+            normalized_header[i] = column
+        return normalized_header
+
     @staticmethod
     def _check_empty_column(column: str, empty_column_id: int) -> Tuple[str, int]:
         """
@@ -136,24 +216,41 @@ class DefaultHeaderNormalizer(HeaderNormalizer):
     """
 
     def __init__(self, permitted_chars: str = PERMITTED_CHARS, forbidden_sub: str = DEFAULT_NON_PERMITTED_SUB,
-                 whitespace_sub: str = DEFAULT_WHITESPACE_SUB):
+                 whitespace_sub: str = DEFAULT_WHITESPACE_SUB, resolve_duplicates: bool = False):
         """
 
         Args:
             permitted_chars: all characters that are permitted to be in a column concatenated together in one string
             forbidden_sub: substitute character for a forbidden character
             whitespace_sub: character to substitute a whitespace
+            resolve_duplicates: make the normalized column names unique
         """
 
-        super().__init__(permitted_chars=permitted_chars, whitespace_sub=whitespace_sub)
+        super().__init__(permitted_chars=permitted_chars, whitespace_sub=whitespace_sub,
+                         resolve_duplicates=resolve_duplicates)
 
         self._check_chars_permitted(forbidden_sub)
         self.forbidden_sub = forbidden_sub
+        self._forbidden_pattern = self._compile_forbidden_pattern(permitted_chars)
+        # escaped so the substitute is not interpreted as a regex template
+        self._forbidden_repl = forbidden_sub.replace('\\', '\\\\')
+
+    def get_config(self) -> dict:
+        return {**super().get_config(), 'forbidden_sub': self.forbidden_sub}
 
     def _normalize_column_name(self, header: str) -> str:
-        header = self._replace_whitespace(header)
-        header = self._replace_forbidden(header)
-        return header
+        return self._forbidden_pattern.sub(self._forbidden_repl, self.whitespace_sub.join(header.split()))
+
+    @staticmethod
+    def _compile_forbidden_pattern(permitted_chars: str):
+        """
+        Compiles a pattern matching any single character that is not permitted. The permitted characters are escaped,
+        so characters like `]`, `^`, `\\` or `-` are matched literally.
+
+        """
+        if not permitted_chars:
+            return re.compile(".", re.DOTALL)
+        return re.compile("[^" + re.escape(permitted_chars) + "]")
 
     def _replace_forbidden(self, in_string: str) -> str:
         """
@@ -166,8 +263,7 @@ class DefaultHeaderNormalizer(HeaderNormalizer):
 
         """
 
-        in_string = re.sub("[^" + self.permitted_chars + "]", self.forbidden_sub, in_string)
-        return in_string
+        return self._forbidden_pattern.sub(self._forbidden_repl, in_string)
 
 
 class EncoderHeaderNormalizer(HeaderNormalizer):
@@ -175,12 +271,18 @@ class EncoderHeaderNormalizer(HeaderNormalizer):
     Normalize headers by encoding character in utf8 or unicode. This enables unique mapping back
     to the original values. e.g. `a#` -> `a_35_`
 
+    The `hex` and `base36` encoders produce shorter alphanumeric codes, e.g. `a#` -> `a_23_` / `a_z_`, while
+    the `utf8` encoder keeps the bytes representation, e.g. `b'#'`, for compatibility with existing names;
+    `utf8_hex` encodes the utf8 bytes as permitted hexadecimal digits instead, e.g. `š` -> `_c5a1_`.
+    The `hex`, `utf8_hex` and `base36` codes are indistinguishable from ordinary words (`_at_` or `_face_` are
+    codes as well), so their names cannot be decoded and a permitted name may collide with an encoded one.
 
     """
 
     def __init__(self, char_encoder: Union[SupportedEncoder, str] = DEFAULT_ENCODER,
                  encode_delimiter: str = DEFAULT_ENCODE_DELIM,
-                 permitted_chars: str = PERMITTED_CHARS, whitespace_sub: str = DEFAULT_WHITESPACE_SUB):
+                 permitted_chars: str = PERMITTED_CHARS, whitespace_sub: str = DEFAULT_WHITESPACE_SUB,
+                 resolve_duplicates: bool = False):
         """
 
         Args:
@@ -188,12 +290,21 @@ class EncoderHeaderNormalizer(HeaderNormalizer):
             char_encoder: type of encoder to be used for encoding forbidden characters
             encode_delimiter : str - character to put before and after an encoded character
             whitespace_sub : str - character to substitute a whitespace
+            resolve_duplicates : bool - make the normalized column names unique
         """
 
-        super().__init__(permitted_chars=permitted_chars, whitespace_sub=whitespace_sub)
+        super().__init__(permitted_chars=permitted_chars, whitespace_sub=whitespace_sub,
+                         resolve_duplicates=resolve_duplicates)
 
         self.encode_delimiter = encode_delimiter
         self.char_encoder = CharEncoder(char_encoder)
+        self._encode_table = self.char_encoder.translate_table(encode_delimiter, permitted_chars)
+        self._decode_pattern = None
+        self._decoded_tokens = {}
+
+    def get_config(self) -> dict:
+        return {**super().get_config(), 'encode_delimiter': self.encode_delimiter,
+                'char_encoder': self.char_encoder.encode_type.value}
 
     def _normalize_column_name(self, column_name: str) -> str:
 
@@ -202,23 +313,104 @@ class EncoderHeaderNormalizer(HeaderNormalizer):
         return new_column_name
 
     def _encode_non_permitted_chars(self, in_string: str) -> str:
+        return in_string.translate(self._encode_table)
+
+    def decode_column_name(self, column_name: str) -> str:
+        """
+        Decodes a normalized column name back to the original value, e.g. `a_35_` -> `a#`.
 
-        column_characters = list(in_string)
-        for i, char in enumerate(column_characters):
-            if char not in self.permitted_chars:
-                column_characters[i] = self.encode_delimiter + str(
-                    self.char_encoder.encode_char(char)) + self.encode_delimiter
-        return "".join(column_characters)
+        Note that the whitespace substitutes are not decoded, since the original whitespace is unknown, and
+        a permitted sequence looking like an encoded character (e.g. `_35_` in the original name) is decoded as well.
+        Sequences the encoder never produces (e.g. `_9999999_` out of the code point range or `_97_` decoding
+        to a permitted character) are kept. Names encoded with the `hex`, `utf8_hex` and `base36` encoders cannot
+        be decoded.
+
+        Args:
+            column_name: Column name normalized by this normalizer
+
+        Returns:
+            The original column name
+
+        Raises:
+            ValueError: If the normalizer uses the `hex`, `utf8_hex` or `base36` encoder
+        """
+        return self._get_decode_pattern().sub(self._decode_match, column_name)
+
+    def decode_header(self, header: List[str]) -> List[str]:
+        """
+        Decodes a whole normalized header back to the original values in a single regex pass, see
+        `decode_column_name()`.
+
+        Args:
+            header: Header normalized by this normalizer
+
+        Returns:
+            List of the original column names
+        """
+        separator = '\0'
+        if any(separator in column for column in header):
+            return [self.decode_column_name(column) for column in header]
+        return self.decode_column_name(separator.join(header)).split(separator) if header else []
+
+    def decode_mapping(self, header: List[str]) -> 'HeaderMapping':
+        """
+        Decodes a normalized header and returns a bidirectional mapping between the original and normalized names,
+        e.g. to map the normalized names back when writing data back to the source.
+
+        Args:
+            header: Header normalized by this normalizer
+
+        Returns:
+            HeaderMapping
+        """
+        return HeaderMapping(self.decode_header(header), header)
+
+    def _get_decode_pattern(self) -> Pattern:
+        if self.char_encoder.encode_type in UNDECODABLE_ENCODERS:
+            raise ValueError(f"Names encoded with the {self.char_encoder.encode_type.value} encoder cannot be "
+                             f"decoded, its codes are indistinguishable from words, e.g. 'my_face_id'")
+        if self._decode_pattern is None:
+            delimiter = re.escape(self.encode_delimiter)
+            self._decode_pattern = re.compile(delimiter + '(' + self.char_encoder.token_pattern + ')' + delimiter)
+        return self._decode_pattern
+
+    def _decode_match(self, match) -> str:
+        token = match.group(1)
+        decoded = self._decoded_tokens.get(token)
+        if decoded is None:
+            decoded = self._decoded_tokens[token] = self._decode_token(token, match.group())
+        return decoded
+
+    def _decode_token(self, token: str, encoded: str) -> str:
+        """
+        Decodes a token, tokens the encoder never produces are part of a permitted name and are kept as they are.
+        That covers tokens out of the code point range, in a form other than the encoder's own (e.g. `035`),
+        and tokens decoding to a permitted character or a whitespace, which is replaced before encoding.
+        """
+        try:
+            decoded = self.char_encoder.decode_token(token)
+        except (ValueError, OverflowError, SyntaxError):
+            return encoded
+        if len(decoded) != 1 or decoded in self._permitted_set or decoded.isspace():
+            return encoded
+        if self.char_encoder.encode_token(decoded) != token:
+            return encoded
+        return decoded
 
 
 class DictHeaderNormalizer(HeaderNormalizer):
     """"
         A class used to normalize headers using a dictionary to replace characters.
      e.g. `{"#":"hsh"}`
+
+     By default all keys are replaced in a single left-to-right pass over each column, preferring the longest
+     key at each position, so replaced values are never replaced again and the result does not depend on the key
+     order. Set `sequential_replace=True` to apply the keys one by one in the dictionary order instead.
     """
 
     def __init__(self, replace_dict: dict, permitted_chars: str = PERMITTED_CHARS,
-                 whitespace_sub: str = DEFAULT_WHITESPACE_SUB):
+                 whitespace_sub: str = DEFAULT_WHITESPACE_SUB, sequential_replace: bool = False,
+                 resolve_duplicates: bool = False):
         """
 
         Args:
@@ -226,17 +418,77 @@ class DictHeaderNormalizer(HeaderNormalizer):
                 is used to replace the key character.
             permitted_chars:
             whitespace_sub:
+            sequential_replace: Apply the keys one by one with `str.replace` in the dictionary order, as in
+                the previous versions. Empty keys are ignored unless this is set.
+            resolve_duplicates: make the normalized column names unique
         """
 
-        super().__init__(permitted_chars=permitted_chars, whitespace_sub=whitespace_sub)
+        super().__init__(permitted_chars=permitted_chars, whitespace_sub=whitespace_sub,
+                         resolve_duplicates=resolve_duplicates)
 
         self.replace_dict = replace_dict
         self._check_dict_permitted(replace_dict)
+        self.sequential_replace = sequential_replace
+        self._replace_table, self._replace_pattern = self._compile_replacement(replace_dict)
+
+    def get_config(self) -> dict:
+        return {**super().get_config(), 'replace_dict': self.replace_dict,
+                'sequential_replace': self.sequential_replace}
 
     def _normalize_column_name(self, column_name: str) -> str:
 
-        new_column_name = self._replace_chars_using_dict(column_name, self.replace_dict)
-        return new_column_name
+        if self.sequential_replace:
+            return self._replace_chars_using_dict(column_name, self.replace_dict)
+        elif self._replace_pattern is not None:
+            return self._replace_pattern.sub(self._replace_match, column_name)
+        else:
+            return column_name.translate(self._replace_table)
+
+    def _replace_match(self, match) -> str:
+        return self.replace_dict[match.group()]
+
+    @staticmethod
+    def _compile_replacement(replace_dict: dict) -> Tuple[dict, Optional[Pattern]]:
+        """
+        Prepares replacement of all keys of the dictionary in a single pass over a string.
+
+        Returns:
+            A `str.translate` table if all keys are single characters, otherwise a regex matching the longest key
+            at each position, compiled from a trie of the keys so a match costs O(key length) and not O(nr of keys).
+
+        """
+
+        keys = [key for key in replace_dict if key]
+        if all(len(key) == 1 for key in keys):
+            return {ord(key): replace_dict[key] for key in keys}, None
+
+        trie = {}
+        for key in keys:
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[''] = True
+        return {}, re.compile(DictHeaderNormalizer._trie_to_regex(trie))
+
+    @staticmethod
+    def _trie_to_regex(node: dict) -> str:
+        """
+        Converts a trie of keys to a regular expression. Optional (`?`) suffixes are greedy, so the longest key
+        is matched first and shorter keys are used only as a fallback.
+
+        """
+
+        branches = []
+        for char, child in sorted(node.items()):
+            if char:
+                branches.append(re.escape(char) + DictHeaderNormalizer._trie_to_regex(child))
+        if not branches:
+            return ''
+
+        if len(branches) == 1 and len(node) == 1:
+            return branches[0]
+        regex = '(?:' + '|'.join(branches) + ')'
+        return regex + '?' if '' in node else regex
 
     @staticmethod
     def _replace_chars_using_dict(in_string: str, replace_dict: dict) -> str:
@@ -266,6 +518,345 @@ class DictHeaderNormalizer(HeaderNormalizer):
             self._check_chars_permitted(in_dict[key])
 
 
+class TransliterateHeaderNormalizer(HeaderNormalizer):
+    """
+    Normalize headers by transliterating characters to their closest ASCII form, e.g. `čas` -> `cas`, `Straße`
+    -> `Strasse`.
+
+    Characters are replaced using a lookup table precomputed once per process from the Unicode NFKD decompositions
+    of the Basic Multilingual Plane and `TRANSLITERATION_OVERRIDES`. Characters that have no ASCII form
+    (e.g. CJK ideographs) and the forbidden ASCII characters are replaced by the `forbidden_sub`, so the output
+    contains only permitted characters.
+    """
+
+    def __init__(self, permitted_chars: str = PERMITTED_CHARS, forbidden_sub: str = DEFAULT_NON_PERMITTED_SUB,
+                 whitespace_sub: str = DEFAULT_WHITESPACE_SUB, replace_dict: Optional[dict] = None,
+                 resolve_duplicates: bool = False):
+        """
+
+        Args:
+            permitted_chars: all characters that are permitted to be in a column concatenated together in one string
+            forbidden_sub: substitute character for a character that cannot be transliterated to permitted ones
+            whitespace_sub: character to substitute a whitespace
+            replace_dict: additional single character transliterations taking precedence over the built-in ones,
+                e.g. `{"ä": "ae"}`
+            resolve_duplicates: make the normalized column names unique
+        """
+
+        super().__init__(permitted_chars=permitted_chars, whitespace_sub=whitespace_sub,
+                         resolve_duplicates=resolve_duplicates)
+
+        self._check_chars_permitted(forbidden_sub)
+        self.forbidden_sub = forbidden_sub
+        self.replace_dict = replace_dict or {}
+        for key, value in self.replace_dict.items():
+            if len(key) != 1:
+                raise ValueError(f"Transliteration key '{key}' is not a single character")
+            self._check_chars_permitted(value)
+        self._transliteration_table = self._build_table()
+
+    def get_config(self) -> dict:
+        return {**super().get_config(), 'forbidden_sub': self.forbidden_sub, 'replace_dict': self.replace_dict}
+
+    def _normalize_column_name(self, column_name: str) -> str:
+        return self.whitespace_sub.join(column_name.split()).translate(self._transliteration_table)
+
+    def _build_table(self) -> '_TransliterationTable':
+        table = _TransliterationTable(self.forbidden_sub)
+        table.update((ord(char), self.forbidden_sub) for char in map(chr, range(128)))
+        permitted = self._permitted_set
+        for code_point, ascii_form in _get_ascii_forms().items():
+            table[code_point] = ''.join(char for char in ascii_form if char in permitted) or self.forbidden_sub
+        table.update((ord(char), char) for char in self.permitted_chars)
+        table.update((ord(key), value) for key, value in self.replace_dict.items())
+        return table
+
+
+class _TransliterationTable(dict):
+    """
+    A `str.translate` table, characters missing in the table are replaced by the substitute.
+
+    """
+
+    def __init__(self, forbidden_sub: str):
+        super().__init__()
+        self._forbidden_sub = forbidden_sub
+
+    def __missing__(self, code_point: int) -> str:
+        return self._forbidden_sub
+
+
+@lru_cache(maxsize=None)
+def _get_ascii_forms() -> Dict[int, str]:
+    """
+    Computes ASCII forms of the non-ASCII characters of the Basic Multilingual Plane: the ASCII characters of their
+    NFKD decomposition (i.e. without the combining marks) and the `TRANSLITERATION_OVERRIDES`.
+
+    """
+    ascii_forms = {}
+    for code_point in range(0x80, 0x10000):
+        char = chr(code_point)
+        if unicodedata.decomposition(char):
+            ascii_form = ''.join(c for c in unicodedata.normalize('NFKD', char) if c < '\x80')
+            if ascii_form:
+                ascii_forms[code_point] = ascii_form
+    ascii_forms.update((ord(char), ascii_form) for char, ascii_form in TRANSLITERATION_OVERRIDES.items())
+    return ascii_forms
+
+
+class CachedHeaderNormalizer(HeaderNormalizer):
+    """
+    Wraps any `HeaderNormalizer` with an LRU cache of normalized column names, optionally persisted to a file,
+    so repeated runs over the same schemas only look the names up.
+
+    The file stores the configuration of the wrapped normalizer (`get_config()`) along with the cached names.
+    A file created by a differently configured normalizer is ignored.
+
+    Usage example:
+
+        normalizer = CachedHeaderNormalizer(get_normalizer(NormalizerStrategy.DEFAULT), cache_path='names.json.gz')
+        header = normalizer.normalize_header(header)
+        normalizer.save()
+    """
+
+    def __init__(self, normalizer: HeaderNormalizer, maxsize: int = DEFAULT_CACHE_SIZE, cache_path: str = None):
+        """
+
+        Args:
+            normalizer: The normalizer whose results are cached
+            maxsize: Maximum number of cached column names, the least recently used are evicted first
+            cache_path: Optional path of the persisted cache. If it exists, it is loaded
+        """
+
+        super().__init__(permitted_chars=normalizer.permitted_chars, whitespace_sub=normalizer.whitespace_sub,
+                         resolve_duplicates=normalizer.resolve_duplicates)
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive number")
+
+        self.normalizer = normalizer
+        self.maxsize = maxsize
+        self.cache_path = cache_path
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        if cache_path and os.path.exists(cache_path):
+            self.load(cache_path)
+
+    def get_config(self) -> dict:
+        return self.normalizer.get_config()
+
+    def _normalize_column_name(self, column_name: str) -> str:
+        normalized = self._cache.get(column_name)
+        if normalized is not None:
+            self.hits += 1
+            self._cache.move_to_end(column_name)
+            return normalized
+
+        self.misses += 1
+        normalized = self._cache[column_name] = self.normalizer._normalize_column_name(column_name)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return normalized
+
+    @property
+    def cache_size(self) -> int:
+        """
+        Number of cached column names.
+        """
+        return len(self._cache)
+
+    def load(self, cache_path: str = None) -> bool:
+        """
+        Loads cached names from a file created by `save()`.
+
+        Args:
+            cache_path: Path of the file. Default: `cache_path` of the normalizer
+
+        Returns:
+            False if the file was created with a different normalizer configuration or is not a valid cache file
+            (e.g. corrupt), nothing is loaded then and the names are normalized again
+        """
+        with gzip.open(cache_path or self.cache_path, 'rt', encoding='utf-8') as f:
+            try:
+                content = json.load(f)
+                if content.get('config') != self.get_config():
+                    return False
+                names = [(column_name, normalized) for column_name, normalized in content['names']
+                         if isinstance(column_name, str) and isinstance(normalized, str)]
+            except (OSError, EOFError, ValueError, KeyError, TypeError, AttributeError):
+                # gzip.BadGzipFile is an OSError, json.JSONDecodeError and UnicodeDecodeError are ValueErrors
+                return False
+
+        self._cache.update(names)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return True
+
+    def save(self, cache_path: str = None):
+        """
+        Saves the cached names to a gzip compressed JSON file. The file is replaced atomically.
+
+        Args:
+            cache_path: Path of the file. Default: `cache_path` of the normalizer
+        """
+        cache_path = cache_path or self.cache_path
+        if not cache_path:
+            raise ValueError("cache_path is not specified")
+
+        # a unique temporary file, so concurrent runs sharing the cache do not overwrite each other's file
+        directory = os.path.dirname(os.path.abspath(cache_path))
+        with tempfile.NamedTemporaryFile('wb', dir=directory, delete=False) as out_file:
+            try:
+                with gzip.open(out_file, 'wt', encoding='utf-8') as f:
+                    json.dump({'config': self.get_config(), 'names': list(self._cache.items())}, f,
+                              ensure_ascii=False, separators=(',', ':'))
+            except BaseException:
+                os.unlink(out_file.name)
+                raise
+        os.replace(out_file.name, cache_path)
+
+
+class HeaderMapping:
+    """
+    Bidirectional mapping between original and normalized column names with O(1) lookups in both directions.
+
+    If several original names map to the same normalized name, the first one is returned by `original()`.
+    """
+
+    def __init__(self, original_header: List[str], normalized_header: List[str]):
+        """
+
+        Args:
+            original_header: original column names
+            normalized_header: normalized column names in the same order
+        """
+        if len(original_header) != len(normalized_header):
+            raise ValueError("Original and normalized headers must have the same length")
+
+        self.original_header = list(original_header)
+        self.normalized_header = list(normalized_header)
+        self._to_normalized = {}
+        self._to_original = {}
+        for original, normalized in zip(self.original_header, self.normalized_header):
+            self._to_normalized.setdefault(original, normalized)
+            self._to_original.setdefault(normalized, original)
+
+    def normalized(self, original_name: str) -> str:
+        """
+        Returns the normalized name of an original column. Raises KeyError for unknown columns.
+        """
+        return self._to_normalized[original_name]
+
+    def original(self, normalized_name: str) -> str:
+        """
+        Returns the original name of a normalized column. Raises KeyError for unknown columns.
+        """
+        return self._to_original[normalized_name]
+
+    def to_dict(self) -> dict:
+        """
+        Returns the original -> normalized name dictionary.
+        """
+        return dict(self._to_normalized)
+
+    def __len__(self):
+        return len(self.original_header)
+
+    def __iter__(self):
+        return iter(zip(self.original_header, self.normalized_header))
+
+
+def normalize_records(records: Iterable[Dict[str, Any]], normalizer: HeaderNormalizer, flatten: bool = False,
+                      separator: str = DEFAULT_WHITESPACE_SUB, maxsize: int = DEFAULT_CACHE_SIZE,
+                      resolve_duplicates: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily normalizes keys of (nested) dictionary records, e.g. API responses flattened into CSV tables.
+
+    The keys of each record (or nested dictionary) are normalized as a header with `normalize_header()`.
+    Normalized names are memoized both per key and per distinct key set in LRU caches bounded by `maxsize`,
+    so repeating keys are normalized only once per run and memory stays bounded for high-cardinality keys.
+
+    Keys that collide after normalization or flattening (e.g. `a#b` and `ab`, or `{"a": {"b": 1}}` and `a_b`)
+    are made unique with a `_<N>` suffix in the order of the record, as with `resolve_duplicates=True`
+    in `normalize_header()`, so no value is lost.
+
+    Args:
+        records: Iterable of dictionaries
+        normalizer: `HeaderNormalizer` used to normalize the keys, e.g. from `get_normalizer()`
+        flatten: Flatten nested dictionaries into top level keys joined by the separator, e.g. `{"a": {"b": 1}}`
+            -> `{"a_b": 1}`; the joined keys are normalized. Otherwise keys of nested dictionaries are normalized.
+            Lists are kept as values, dictionaries in them are normalized the same way as the records
+        separator: Separator of the flattened keys
+        maxsize: Maximum number of memoized keys and key sets
+        resolve_duplicates: Make colliding keys unique, otherwise a ValueError is raised on a collision
+
+    Returns:
+        Generator of records with normalized keys
+
+    Raises:
+        ValueError: If keys of a record collide and `resolve_duplicates` is False
+    """
+    if not isinstance(normalizer, CachedHeaderNormalizer):
+        normalizer = CachedHeaderNormalizer(normalizer, maxsize=maxsize)
+    key_sets = OrderedDict()
+
+    def normalize_keys(keys: Tuple, values: Iterable[Any]) -> Dict[str, Any]:
+        normalized = key_sets.get(keys)
+        if normalized is None:
+            normalized = key_sets[keys] = _normalize_keys(normalizer, keys, resolve_duplicates)
+            if len(key_sets) > maxsize:
+                key_sets.popitem(last=False)
+        else:
+            key_sets.move_to_end(keys)
+        return dict(zip(normalized, values))
+
+    def normalize_value(value: Any) -> Any:
+        if isinstance(value, dict):
+            return normalize_record(value)
+        if isinstance(value, list):
+            return [normalize_value(item) for item in value]
+        return value
+
+    def normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+        if flatten:
+            items = _flatten_record(record, separator)
+            return normalize_keys(tuple(key for key, _ in items), [normalize_value(value) for _, value in items])
+        return normalize_keys(tuple(record), [normalize_value(value) for value in record.values()])
+
+    for record in records:
+        yield normalize_record(record)
+
+
+def _normalize_keys(normalizer: HeaderNormalizer, keys: Tuple, resolve_duplicates: bool) -> List[str]:
+    keys = [str(key) for key in keys]
+    if resolve_duplicates:
+        return normalizer._normalize_header_unique(keys)
+
+    normalized = normalizer.normalize_header(keys)
+    originals = {}
+    for key, column in zip(keys, normalized):
+        if column in originals:
+            raise ValueError(f"Keys '{originals[column]}' and '{key}' collide after normalization to '{column}'")
+        originals[column] = key
+    return normalized
+
+
+def _flatten_record(record: Dict[str, Any], separator: str, prefix: str = '',
+                    flattened: List[Tuple[str, Any]] = None) -> List[Tuple[str, Any]]:
+    """
+    Returns the (joined key, value) pairs of the leaves, keys that collide after joining are all kept.
+    """
+    if flattened is None:
+        flattened = []
+    for key, value in record.items():
+        key = prefix + str(key)
+        if isinstance(value, dict) and value:
+            _flatten_record(value, separator, key + separator, flattened)
+        else:
+            flattened.append((key, value))
+    return flattened
+
+
 class NormalizerStrategy(Enum):
     """"
         Enumerator for column normalization strategies
@@ -280,10 +871,13 @@ class NormalizerStrategy(Enum):
             Normalize headers using a character encoder
         DICT :
             Normalize headers using a dictionary to replace characters
+        TRANSLITERATE :
+            Normalize headers by transliterating characters to ASCII
         """
     DEFAULT = "DEFAULT"
     ENCODER = "ENCODER"
     DICT = "DICT"
+    TRANSLITERATE = "TRANSLITERATE"
 
 
 def get_normalizer(strategy: NormalizerStrategy, **params) -> HeaderNormalizer:
@@ -295,7 +889,7 @@ def get_normalizer(strategy: NormalizerStrategy, **params) -> HeaderNormalizer:
             Normalize headers using a substitute character
 
         ENCODER :
-            Normalize headers by encoding character in utf8 or unicode. This enables unique mapping back
+            Normalize headers by encoding character in utf8, unicode, hex or base36. This enables unique mapping back
              to the original values. e.g. `a#` -> `a_35_`
 
                  params:
@@ -304,7 +898,16 @@ def get_normalizer(strategy: NormalizerStrategy, **params) -> HeaderNormalizer:
             Specify a dictionary with character replacements. e.g. {"#":"hsh"}
 
                 params:
-                `replace_dict`
+                `replace_dict`, `sequential_replace: bool = False`
+        TRANSLITERATE :
+            Transliterate characters to their closest ASCII form, e.g. `čas` -> `cas`. Characters without one
+            are replaced by a substitute.
+
+                params:
+                `forbidden_sub: str = DEFAULT_NON_PERMITTED_SUB`, `replace_dict: dict = None` - additional
+                single character transliterations, e.g. {"ä": "ae"}
+    All strategies accept `resolve_duplicates: bool = False` to make the normalized column names unique.
+
     Args:
         strategy:
         **params:
@@ -321,5 +924,8 @@ def get_normalizer(strategy: NormalizerStrategy, **params) -> HeaderNormalizer:
 
     elif strategy == NormalizerStrategy.DICT:
         return DictHeaderNormalizer(**params)
+
+    elif strategy == NormalizerStrategy.TRANSLITERATE:
+        return TransliterateHeaderNormalizer(**params)
     else:
         raise ValueError(f"Strategy '{strategy}' is not supported")
@@ -12,3 +12,28 @@ class TestFormatterUtils(unittest.TestCase):
         char_encoder = CharEncoder("utf8")
         encoded_char = char_encoder.encode_char("š")
         self.assertEqual(encoded_char, b'\xc5\xa1')
+
+    def test_decode_token(self):
+        self.assertEqual(CharEncoder("unicode").decode_token("35"), "#")
+        self.assertEqual(CharEncoder("utf8").decode_token(str(b'\xc5\xa1')), "š")
+
+    def test_hex_and_base36_encode_char(self):
+        self.assertEqual(CharEncoder("hex").encode_char("#"), "23")
+        self.assertEqual(CharEncoder("base36").encode_char("#"), "z")
+        self.assertEqual(CharEncoder("base36").encode_char("š"), "9t")
+        self.assertEqual(CharEncoder("utf8_hex").encode_char("š"), "c5a1")
+        for encoder in ("hex", "base36", "utf8_hex"):
+            char_encoder = CharEncoder(encoder)
+            for char in ("\0", "#", "š", "名", "￿", "😀"):
+                self.assertEqual(char_encoder.decode_token(char_encoder.encode_char(char)), char)
+
+    def test_encode_string(self):
+        self.assertEqual(CharEncoder("unicode").encode_string("a#š😀", "_", "a"), "a_35__353__128512_")
+        self.assertEqual(CharEncoder("utf8_hex").encode_string("a#š", "_", "a"), "a_23__c5a1_")
+        self.assertEqual(CharEncoder("utf8_hex").encode_many(["'\\", "名😀"]), ["275c", "e5908df09f9880"])
+        with self.assertRaises(ValueError):
+            CharEncoder("utf8").encode_string("š", "_")
+        with self.assertRaises(ValueError):
+            CharEncoder("utf8").encode_many(["š"])
+        self.assertEqual(CharEncoder("hex").encode_string("#š"), "23161")
+        self.assertEqual(CharEncoder("base36").encode_many(["a#", "", "名x"], "-", "ax"), ["a-z-", "", "-glp-x"])
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+import unittest
+from datetime import datetime
+
+from keboola.utils.chunk_executor import ChunkExecutionError, execute_chunks, execute_chunks_async, \
+    iterate_chunks_async
+from keboola.utils.date import split_dates_to_chunks
+
+
+def chunk_days(chunk):
+    return (datetime.fromisoformat(chunk['end_date']) - datetime.fromisoformat(chunk['start_date'])).days
+
+
+class TestChunkExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.plan = split_dates_to_chunks(datetime(2021, 1, 1), datetime(2021, 3, 1), 3)
+
+    def test_ordered_results(self):
+        def extract(chunk):
+            # later chunks finish first
+            time.sleep(0.02 * (len(self.plan) - self.plan.index(chunk)) / len(self.plan))
+            return chunk['start_date']
+
+        results = list(execute_chunks(iter(self.plan), extract, max_workers=8))
+        self.assertEqual([r.result for r in results], [c['start_date'] for c in self.plan])
+        self.assertTrue(all(r.error is None and r.attempts == 1 for r in results))
+
+    def test_as_completed_bounded_concurrency(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def extract(chunk):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.005)
+            with lock:
+                running[0] -= 1
+            return chunk
+
+        results = list(execute_chunks(self.plan, extract, max_workers=3, ordered=False))
+        self.assertCountEqual([r.result for r in results], self.plan)
+        self.assertLessEqual(running[1], 3)
+
+    def test_retry_with_backoff(self):
+        attempts = {}
+
+        def flaky(chunk):
+            attempts[chunk['start_date']] = attempts.get(chunk['start_date'], 0) + 1
+            if attempts[chunk['start_date']] < 3:
+                raise ConnectionError("timeout")
+            return 1
+
+        results = list(execute_chunks(self.plan, flaky, max_retries=2, backoff=0.001, retry_on=(ConnectionError,)))
+        self.assertEqual([r.attempts for r in results], [3] * len(self.plan))
+        self.assertEqual(sum(r.result for r in results), len(self.plan))
+
+    def test_fatal_error_cancels_remaining_chunks(self):
+        started = []
+
+        def extract(chunk):
+            started.append(chunk)
+            if chunk is self.plan[2]:
+                raise ValueError("invalid response")
+            time.sleep(0.01)
+
+        with self.assertRaises(ChunkExecutionError) as context:
+            list(execute_chunks(self.plan, extract, max_workers=2, max_retries=5, retry_on=(ConnectionError,)))
+        self.assertIs(context.exception.chunk, self.plan[2])
+        self.assertEqual(context.exception.attempts, 1)
+        self.assertIsInstance(context.exception.__cause__, ValueError)
+        self.assertLess(len(started), len(self.plan))
+
+    def test_errors_without_fail_fast(self):
+        def extract(chunk):
+            if chunk is self.plan[0]:
+                raise ValueError("invalid response")
+            return chunk
+
+        results = list(execute_chunks(self.plan, extract, fail_fast=False, max_retries=1, backoff=0))
+        self.assertIsInstance(results[0].error, ValueError)
+        self.assertEqual(results[0].attempts, 2)
+        self.assertEqual([r.result for r in results[1:]], self.plan[1:])
+
+    def test_process_pool(self):
+        results = list(execute_chunks(self.plan, chunk_days, max_workers=2, use_processes=True))
+        self.assertEqual(sum(r.result for r in results), 59)
+
+
+class TestChunkExecutorAsync(unittest.TestCase):
+
+    def setUp(self):
+        self.plan = split_dates_to_chunks(datetime(2021, 1, 1), datetime(2021, 3, 1), 3)
+
+    @staticmethod
+    def _collect(results):
+        async def collect():
+            return [result async for result in results]
+
+        return asyncio.run(collect())
+
+    def test_ordered_results_with_concurrency_cap(self):
+        running = [0, 0]
+
+        async def fetch(chunk):
+            running[0] += 1
+            running[1] = max(running)
+            # later chunks finish first
+            await asyncio.sleep(0.005 * (len(self.plan) - self.plan.index(chunk)))
+            running[0] -= 1
+            return chunk['start_date']
+
+        results = self._collect(execute_chunks_async(self.plan, fetch, max_concurrency=5))
+        self.assertEqual([r.result for r in results], [c['start_date'] for c in self.plan])
+        self.assertEqual(running[1], 5)
+
+        async def fetch_last_first(chunk):
+            if chunk != self.plan[-1]:
+                await asyncio.sleep(0.05)
+            return chunk['start_date']
+
+        results = self._collect(execute_chunks_async(self.plan, fetch_last_first, max_concurrency=50, ordered=False))
+        self.assertEqual(results[0].chunk, self.plan[-1])
+        self.assertCountEqual([r.chunk for r in results], self.plan)
+
+    def test_rate_limit_and_retries(self):
+        calls = []
+
+        async def fetch(chunk):
+            calls.append(chunk)
+            if calls.count(chunk) == 1:
+                raise ConnectionError("timeout")
+            return chunk
+
+        start = time.perf_counter()
+        results = self._collect(execute_chunks_async(iterate_chunks_async(self.plan, yield_every=3), fetch,
+                                                     max_concurrency=100, requests_per_second=400, max_retries=1,
+                                                     backoff=0))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual([r.result for r in results], self.plan)
+        self.assertEqual([r.attempts for r in results], [2] * len(self.plan))
+        self.assertGreaterEqual(elapsed, (2 * len(self.plan) - 1) / 400)
+
+    def test_fatal_error_cancels_running_chunks(self):
+        cancelled = []
+
+        async def fetch(chunk):
+            if chunk is self.plan[3]:
+                raise ValueError("invalid response")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(chunk)
+                raise
+
+        start = time.perf_counter()
+        with self.assertRaises(ChunkExecutionError) as context:
+            self._collect(execute_chunks_async(self.plan, fetch, max_concurrency=4, ordered=False))
+        self.assertIs(context.exception.chunk, self.plan[3])
+        self.assertEqual(len(cancelled), 3)
+        self.assertLess(time.perf_counter() - start, 5)
@@ -0,0 +1,153 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from keboola.utils.csv_header import _binary_lines, main, normalize_csv_header, normalize_tables, read_csv_header
+from keboola.utils.char_encoder import SupportedEncoder
+from keboola.utils.header_normalizer import get_normalizer, NormalizerStrategy
+
+
+class TestCsvHeader(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.normalizer = get_normalizer(NormalizerStrategy.DEFAULT, forbidden_sub="_")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, content: bytes, name: str = 'table.csv') -> str:
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_read_csv_header_multiline(self):
+        path = self._write(b'"first\ncol","sec""ond",third\r\n1,2,3\r\n')
+        self.assertEqual(read_csv_header(path), ['first\ncol', 'sec"ond', 'third'])
+
+    def test_normalize_carriage_return_line_endings(self):
+        body = b''.join(b'%d,"a\rb"\r' % i for i in range(10000))
+        path = self._write(b'"multi\rline col",c#\r' + body)
+
+        self.assertEqual(read_csv_header(path), ['multi\rline col', 'c#'])
+        self.assertEqual(normalize_csv_header(path, self.normalizer), ['multi_line_col', 'c_'])
+        self.assertEqual(self._read(path), b'multi_line_col,c_\r' + body)
+
+    def test_binary_lines(self):
+        content = b'a\r\nb\rc\n\r\r\nd'
+        for block_size in (1, 2, 3, 100):
+            with self.subTest(block_size=block_size):
+                lines = list(_binary_lines(io.BytesIO(content), block_size))
+                self.assertEqual(lines, [b'a\r\n', b'b\r', b'c\n', b'\r', b'\r\n', b'd'])
+        self.assertEqual(list(_binary_lines(io.BytesIO(b''))), [])
+
+    def test_normalize_same_length_in_place(self):
+        body = b''.join(b'%d,"a\nb",c\n' % i for i in range(1000))
+        path = self._write(b'a#b,c d,e\n' + body)
+        inode = os.stat(path).st_ino
+
+        header = normalize_csv_header(path, self.normalizer)
+
+        self.assertEqual(header, ['a_b', 'c_d', 'e'])
+        self.assertEqual(self._read(path), b'a_b,c_d,e\n' + body)
+        self.assertEqual(os.stat(path).st_ino, inode)
+
+    def test_normalize_different_length_in_place(self):
+        body = b'x' * (3 * 1024 * 1024) + b'\r\n1,2\r\n'
+        path = self._write(b'"multi\nline col",  spaced  \r\n' + body)
+
+        header = normalize_csv_header(path, get_normalizer(NormalizerStrategy.DEFAULT))
+
+        self.assertEqual(header, ['multi_line_col', 'spaced'])
+        self.assertEqual(self._read(path), b'multi_line_col,spaced\r\n' + body)
+
+    def test_normalize_to_destination_with_dialect(self):
+        path = self._write('čas;"a;b"\n1;2\n'.encode('utf-8-sig'))
+        destination = os.path.join(self.temp_dir.name, 'out.csv')
+
+        header = normalize_csv_header(path, self.normalizer, destination, encoding='utf-8-sig', delimiter=';')
+
+        self.assertEqual(header, ['_as', 'a_b'])
+        self.assertEqual(self._read(destination), '_as;a_b\n1;2\n'.encode('utf-8-sig'))
+        self.assertEqual(self._read(path), 'čas;"a;b"\n1;2\n'.encode('utf-8-sig'))
+
+    def test_normalize_header_only_and_empty_file(self):
+        path = self._write(b'a b,c')
+        self.assertEqual(normalize_csv_header(path, self.normalizer), ['a_b', 'c'])
+        self.assertEqual(self._read(path), b'a_b,c')
+
+        empty = self._write(b'', 'empty.csv')
+        self.assertEqual(normalize_csv_header(empty, self.normalizer), [])
+        self.assertEqual(self._read(empty), b'')
+
+    def _create_tables(self):
+        os.makedirs(os.path.join(self.temp_dir.name, 'nested', 'sliced.csv'))
+        self._write(b'a#b,c d\n1,2\n', 'first.csv')
+        self._write(b'x$,y\n1,2\n', os.path.join('nested', 'second.csv'))
+        self._write(b'\xff,a\n', os.path.join('nested', 'broken.csv'))
+        self._write(b'1,2\n', 'headless.csv')
+        # the slices are headless, the first row would change if normalized as a header
+        self._write(b'1 2,x#\n', os.path.join('nested', 'sliced.csv', 'part1.csv'))
+        self._write(b'my id,v#\n1,2\n', 'keyed.csv')
+        self._write(json.dumps({'primary_key': ['my id'], 'column_metadata': {'v#': []}}).encode(),
+                    'keyed.csv.manifest')
+        manifest = {'columns': ['p k', 'v#'], 'primary_key': ['p k'], 'column_metadata': {'v#': [], 'p k': []}}
+        for name in ('headless.csv.manifest', os.path.join('nested', 'sliced.csv.manifest')):
+            self._write(json.dumps(manifest).encode(), name)
+
+    def test_normalize_tables(self):
+        self._create_tables()
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                report = normalize_tables(self.temp_dir.name, NormalizerStrategy.DEFAULT, {'forbidden_sub': '_'},
+                                          workers=workers)
+
+                self.assertEqual(report.nr_files, 6)
+                self.assertEqual(report.nr_columns, 10)
+                self.assertEqual([os.path.basename(r.path) for r in report.errors], ['broken.csv'])
+                self.assertEqual(self._read(os.path.join(self.temp_dir.name, 'first.csv')), b'a_b,c_d\n1,2\n')
+                self.assertEqual(self._read(os.path.join(self.temp_dir.name, 'headless.csv')), b'1,2\n')
+                with open(os.path.join(self.temp_dir.name, 'nested', 'sliced.csv.manifest')) as f:
+                    manifest = json.load(f)
+                self.assertEqual(manifest['columns'], ['p_k', 'v_'])
+                self.assertEqual(manifest['primary_key'], ['p_k'])
+                self.assertEqual(set(manifest['column_metadata']), {'p_k', 'v_'})
+                self.assertEqual(self._read(os.path.join(self.temp_dir.name, 'nested', 'sliced.csv', 'part1.csv')),
+                                 b'1 2,x#\n')
+                self.assertEqual(self._read(os.path.join(self.temp_dir.name, 'keyed.csv')), b'my_id,v_\n1,2\n')
+                with open(os.path.join(self.temp_dir.name, 'keyed.csv.manifest')) as f:
+                    self.assertEqual(json.load(f), {'primary_key': ['my_id'], 'column_metadata': {'v_': []}})
+                self.assertGreater(report.columns_per_second, 0)
+
+    def test_normalize_tables_enum_params(self):
+        self._write(b'a#b,c\n1,2\n', 'first.csv')
+        self._write(b'x$,y\n1,2\n', 'second.csv')
+
+        report = normalize_tables(self.temp_dir.name, NormalizerStrategy.ENCODER,
+                                  {'char_encoder': SupportedEncoder.hex}, workers=2)
+
+        self.assertEqual(report.errors, [])
+        self.assertEqual(read_csv_header(os.path.join(self.temp_dir.name, 'first.csv')), ['a_23_b', 'c'])
+
+    def test_cli(self):
+        self._create_tables()
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exit_code = main([self.temp_dir.name, '--strategy', 'DICT', '--param', 'replace_dict={"#": "H"}',
+                              '--workers', '1', '--no-manifests'])
+
+        self.assertEqual(exit_code, 1)
+        self.assertIn('broken.csv', stderr.getvalue())
+        self.assertIn('Normalized 5 files', stdout.getvalue())
+        self.assertEqual(self._read(os.path.join(self.temp_dir.name, 'nested', 'sliced.csv', 'part1.csv')),
+                         b'1 2,x#\n')
+        self.assertEqual(self._read(os.path.join(self.temp_dir.name, 'first.csv')), b'aHb,c d\n1,2\n')
@@ -1,11 +1,15 @@
 import dateparser
 import datetime
+import importlib.util
+import pickle
 import types
 import unittest
 import pytz
 
 import keboola.utils.date as dutils
 
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+
 
 class TestDateUtils(unittest.TestCase):
 
@@ -134,3 +138,372 @@ class TestDateUtils(unittest.TestCase):
 
         self.assertIsInstance(date_gen, types.GeneratorType)
         self.assertCountEqual(expected_result, list(date_gen))
+
+    def test_parse_date_iso_matches_dateparser(self):
+        for value in ['2021-01-01', '2021-01-01 10:00', '2021-01-01T10:00:00', '2021-01-01T10:00:00.123456',
+                      '2021-01-01T10:00:00+02:00', '2021-02-30', '5 days ago']:
+            with self.subTest(value=value):
+                expected = dateparser.parse(value)
+                result = dutils.parse_date(value)
+                if 'ago' in value:
+                    self.assertAlmostEqual(expected, result, delta=datetime.timedelta(seconds=5))
+                else:
+                    self.assertEqual(expected, result)
+
+    def test_parse_date_formats_match_dateparser(self):
+        cases = [('01/02/2021 10:00', ['%Y', '%d/%m/%Y %H:%M']),
+                 ('01/2021', ['%m/%Y']),
+                 ('01/02/2021 +0200', ['%d/%m/%Y %z']),
+                 ('2021-01-02', ['%Y-%d-%m']),
+                 ('2021-01-02', ['%d/%m/%Y'])]
+        for value, formats in cases:
+            with self.subTest(value=value):
+                self.assertEqual(dateparser.parse(value, date_formats=formats), dutils.parse_date(value, formats))
+
+    def test_parse_datetime_interval_date_formats(self):
+        self.assertTupleEqual(('2021-02-01', '2021-03-01'),
+                              dutils.parse_datetime_interval('01/02/2021', '01/03/2021', '%Y-%m-%d',
+                                                             date_formats=['%d/%m/%Y']))
+
+    def test_compile_relative_date_matches_dateparser(self):
+        bases = [datetime.datetime(2021, 3, 31, 10, 30, 15, 123456), datetime.datetime(2020, 2, 29, 1, 0, 0)]
+        expressions = ['today', 'now', 'Yesterday', 'tomorrow', '5 hours ago', '3 days ago', '4 months ago',
+                       '1 month ago', '2 years ago', '2 weeks ago', '10 minutes ago', '30 seconds ago', '1 day ago',
+                       ' 5  Days Ago ', 'in 3 days', 'in 1 month']
+        for base in bases:
+            for expression in expressions:
+                with self.subTest(base=base, expression=expression):
+                    expected = dateparser.parse(expression, settings={'RELATIVE_BASE': base})
+                    self.assertEqual(expected, dutils.compile_relative_date(expression).apply(base))
+
+    def test_compile_relative_date_unsupported(self):
+        for expression in ['an hour ago', 'last month', '2021-01-01', '1 year 2 months ago']:
+            with self.subTest(expression=expression):
+                self.assertIsNone(dutils.compile_relative_date(expression))
+
+    def test_relative_offset_apply_timezone(self):
+        tz = pytz.timezone('Europe/Prague')
+        offset = dutils.compile_relative_date('3 days ago')
+        result = offset.apply(datetime.datetime(2021, 3, 10, 10, 0, 0), tz)
+        self.assertEqual(result, datetime.datetime(2021, 3, 7, 10, 0, 0, tzinfo=tz))
+        self.assertIs(result.tzinfo, tz)
+        self.assertEqual(offset, dutils.compile_relative_date('3 day ago'))
+
+    def test_date_parser_restricted_languages(self):
+        parser = dutils.DateParser(languages=['cs']).warm_up()
+        self.assertEqual(datetime.datetime(2021, 1, 5), parser.parse('5. ledna 2021'))
+        self.assertEqual(datetime.datetime(2021, 1, 5), parser.parse('2021-01-05'))
+        # the English relative grammar is not used when English is not allowed
+        self.assertIsNone(parser.parse('3 days ago'))
+
+    def test_date_parser_settings_match_dateparser(self):
+        settings = {'RELATIVE_BASE': datetime.datetime(2021, 3, 10, 10, 0, 0)}
+        parser = dutils.DateParser(languages=['en'], settings=settings)
+        for value in ['3 days ago', '2021-01-01', 'March 1st 2021', 'last month']:
+            with self.subTest(value=value):
+                self.assertEqual(dateparser.parse(value, languages=['en'], settings=settings), parser.parse(value))
+
+        tz_settings = {'TIMEZONE': 'Europe/Prague', 'RETURN_AS_TIMEZONE_AWARE': True}
+        tz_parser = dutils.DateParser(settings=tz_settings)
+        self.assertEqual(dateparser.parse('2021-01-01', settings=tz_settings), tz_parser.parse('2021-01-01'))
+
+    def test_parse_datetime_interval_parser(self):
+        parser = dutils.DateParser(settings={'RELATIVE_BASE': datetime.datetime(2021, 3, 10, 10, 0, 0)})
+        self.assertTupleEqual(('2021-03-07', '2021-03-09'),
+                              dutils.parse_datetime_interval('3 days ago', 'yesterday', '%Y-%m-%d', parser=parser))
+
+    def test_package_exports_date_members(self):
+        import keboola.utils
+        self.assertCountEqual(keboola.utils.__all__, dutils.__all__)
+
+    def test_date_cache_hits_and_eviction(self):
+        cache = dutils.DateCache(maxsize=2, granularity=datetime.timedelta(hours=1))
+        first = dutils.parse_datetime_interval('5 days ago', 'today', '%Y-%m-%d', cache=cache)
+        second = dutils.parse_datetime_interval('5 days ago', 'today', '%Y-%m-%d', cache=cache)
+        self.assertEqual(first, second)
+        self.assertEqual((1, 1, 0, 2, 1), tuple(cache.cache_info()))
+
+        dutils.parse_datetime_interval('4 days ago', 'today', cache=cache)
+        dutils.parse_datetime_interval('3 days ago', 'today', cache=cache)
+        info = cache.cache_info()
+        self.assertEqual((info.evictions, info.currsize), (1, 2))
+
+        cache.clear()
+        self.assertEqual((0, 0, 0, 2, 0), tuple(cache.cache_info()))
+
+    def test_date_cache_get_past_date_keys(self):
+        cache = dutils.DateCache(granularity=datetime.timedelta(days=1))
+        tz = pytz.timezone('Europe/Prague')
+        to_date = datetime.datetime(2021, 3, 10, 10, 0, 0)
+        expected = dutils.get_past_date('3 days ago', to_date=to_date, tz=tz)
+
+        cached = dutils.get_past_date('3 days ago', to_date=to_date, tz=tz, cache=cache)
+        self.assertAlmostEqual(expected, cached, delta=datetime.timedelta(seconds=5))
+        self.assertIs(cached, dutils.get_past_date('3 days ago', to_date=to_date + datetime.timedelta(hours=1),
+                                                   tz=tz, cache=cache))
+        dutils.get_past_date('3 days ago', to_date=to_date, tz=pytz.utc, cache=cache)
+        dutils.get_past_date('3 days ago', to_date=to_date - datetime.timedelta(days=1), tz=tz, cache=cache)
+        self.assertEqual((1, 3), cache.cache_info()[:2])
+
+    def test_date_cache_errors_not_cached(self):
+        cache = dutils.DateCache()
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                dutils.parse_datetime_interval('yesterday', '5 days ago', cache=cache)
+        self.assertEqual(0, cache.cache_info().currsize)
+
+    def test_date_cache_thread_safe(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        cache = dutils.DateCache(maxsize=8)
+        values = [f'{i % 16} days ago' for i in range(400)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda v: dutils.get_past_date(v, cache=cache), values))
+        info = cache.cache_info()
+        self.assertEqual(400, info.hits + info.misses)
+        self.assertEqual(8, info.currsize)
+
+    def test_get_past_dates_batch(self):
+        tz = pytz.timezone('Europe/Prague')
+        to_date = datetime.datetime(2021, 3, 10, 10, 0, 0)
+        expressions = ['3 days ago', 'yesterday', 'not a date', '3 days ago', '2021-01-01']
+        results = dutils.get_past_dates(expressions, to_date=to_date, tz=tz)
+
+        self.assertEqual(expressions, [r.input for r in results])
+        self.assertEqual('2021-03-07', results[0].result.strftime('%Y-%m-%d'))
+        self.assertEqual('2021-03-09', results[1].result.strftime('%Y-%m-%d'))
+        self.assertIsNone(results[2].result)
+        self.assertIsNotNone(results[2].error)
+        self.assertIs(results[0], results[3])
+        self.assertIsNone(results[4].error)
+
+    def test_parse_datetime_intervals_single_snapshot(self):
+        periods = [('5 days ago', 'today'), ('10 days ago', 'now'), ('today', '5 days ago')]
+        results = dutils.parse_datetime_intervals(periods)
+
+        self.assertEqual(periods, [r.input for r in results])
+        self.assertEqual(results[0].result[1], results[1].result[1])
+        self.assertEqual(results[0].result[1] - datetime.timedelta(days=5), results[0].result[0])
+        self.assertIsInstance(results[2].error, ValueError)
+
+    def test_split_dates_to_chunks_aligned(self):
+        dt_1 = datetime.datetime(2021, 1, 15, 12, 0, 0, tzinfo=pytz.UTC)
+        dt_2 = datetime.datetime(2022, 2, 10, 0, 0, 0, tzinfo=pytz.UTC)
+        expected = {
+            ('month', 5): [('2021-01-15', '2021-06-01'), ('2021-06-01', '2021-11-01'), ('2021-11-01', '2022-02-10')],
+            ('quarter', 0): [('2021-01-15', '2021-04-01'), ('2021-04-01', '2021-07-01'), ('2021-07-01', '2021-10-01'),
+                             ('2021-10-01', '2022-01-01'), ('2022-01-01', '2022-02-10')],
+            ('year', 1): [('2021-01-15', '2022-01-01'), ('2022-01-01', '2022-02-10')],
+            ('week', 20): [('2021-01-15', '2021-05-31'), ('2021-05-31', '2021-10-18'), ('2021-10-18', '2022-02-10')],
+            ('day', 200): [('2021-01-15', '2021-08-03'), ('2021-08-03', '2022-02-10')]
+        }
+        for (align, intv), chunks in expected.items():
+            with self.subTest(align=align):
+                result = dutils.split_dates_to_chunks(dt_1, dt_2, intv, align=align)
+                self.assertEqual([(c['start_date'], c['end_date']) for c in result], chunks)
+
+    def test_split_dates_to_chunks_aligned_within_period(self):
+        dt_1 = datetime.datetime(2021, 1, 5)
+        dt_2 = datetime.datetime(2021, 1, 20)
+        self.assertEqual(dutils.split_dates_to_chunks(dt_1, dt_2, 1, align=dutils.ChunkAlignment.month),
+                         [{'start_date': '2021-01-05', 'end_date': '2021-01-20'}])
+        with self.assertRaises(ValueError):
+            dutils.split_dates_to_chunks(dt_1, dt_2, 1, align='decade')
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+    def test_split_dates_to_chunks_vectorized(self):
+        dt_1 = datetime.datetime(2020, 2, 27, 13, 30, 15, 500, tzinfo=pytz.UTC)
+        dt_2 = datetime.datetime(2021, 3, 2, 7, 0, 0, tzinfo=pytz.UTC)
+        for align in (None, 'day', 'week', 'month', 'quarter', 'year'):
+            for intv in (0, 1, 3, 30, 1000):
+                for strformat in ('%Y-%m-%d', '%Y-%m-%d %H:%M:%S.%f', '%d.%m.%Y %H:%M %Z'):
+                    with self.subTest(align=align, intv=intv, strformat=strformat):
+                        self.assertEqual(dutils.split_dates_to_chunks(dt_1, dt_2, intv, strformat, align=align),
+                                         dutils.split_dates_to_chunks(dt_1, dt_2, intv, strformat, align=align,
+                                                                      vectorized=True))
+        date_gen = dutils.split_dates_to_chunks(dt_1, dt_2, 1, generator=True, vectorized=True)
+        self.assertIsInstance(date_gen, types.GeneratorType)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+    def test_split_dates_to_chunks_vectorized_dst_and_dates(self):
+        prague = pytz.timezone('Europe/Prague')
+        dst_dates = (prague.localize(datetime.datetime(2021, 3, 20)), prague.localize(datetime.datetime(2021, 4, 5)))
+        cases = [(*dst_dates, '%Y-%m-%d %H:%M %z'),
+                 (datetime.date(2021, 1, 1), datetime.date(2021, 1, 22), '%Y%m%d %H')]
+        for dt_1, dt_2, strformat in cases:
+            for align, intv in ((None, 0), (None, 4), (None, 30), ('day', 1), ('week', 1), ('month', 1)):
+                for compact in (False, True):
+                    with self.subTest(dt_1=dt_1, align=align, intv=intv, compact=compact):
+                        expected = dutils.split_dates_to_chunks(dt_1, dt_2, intv, strformat, align=align,
+                                                                compact=compact)
+                        result = dutils.split_dates_to_chunks(dt_1, dt_2, intv, strformat, align=align,
+                                                              vectorized=True, compact=compact)
+                        self.assertEqual(result, expected)
+        self.assertEqual(dutils.split_dates_to_chunks(*dst_dates, 30, '%Y-%m-%d %H:%M %z', vectorized=True)[-1],
+                         {'start_date': '2021-03-20 00:00 +0100', 'end_date': '2021-04-05 00:00 +0200'})
+
+    def test_chunk_sequence(self):
+        dt_1 = datetime.datetime(2021, 1, 1, 0, 0, 0, tzinfo=pytz.UTC)
+        dt_2 = datetime.datetime(2021, 1, 1, 1, 10, 0, tzinfo=pytz.UTC)
+        plan = dutils.ChunkSequence(dt_1, dt_2, datetime.timedelta(minutes=20), '%H:%M')
+
+        expected = [{'start_date': '00:00', 'end_date': '00:20'}, {'start_date': '00:20', 'end_date': '00:40'},
+                    {'start_date': '00:40', 'end_date': '01:00'}, {'start_date': '01:00', 'end_date': '01:10'}]
+        self.assertEqual(len(plan), 4)
+        self.assertEqual(list(plan), expected)
+        self.assertEqual(list(reversed(plan)), expected[::-1])
+        self.assertEqual(plan[-1], expected[-1])
+        self.assertEqual(list(plan[1::2]), expected[1::2])
+        self.assertEqual(list(plan[::-1][1:3]), expected[::-1][1:3])
+        self.assertIsInstance(plan[1:], dutils.ChunkSequence)
+        with self.assertRaises(IndexError):
+            plan[4]
+
+    def test_chunk_sequence_large_plan(self):
+        dt_1 = datetime.datetime(2011, 1, 1)
+        dt_2 = datetime.datetime(2021, 1, 1)
+        plan = dutils.ChunkSequence(dt_1, dt_2, datetime.timedelta(minutes=1), strformat=None)
+
+        self.assertEqual(len(plan), 5260320)
+        self.assertEqual(plan[-1], {'start_date': dt_2 - datetime.timedelta(minutes=1), 'end_date': dt_2})
+        worker_plan = plan[3::8]
+        self.assertEqual(len(worker_plan), 657540)
+        self.assertEqual(worker_plan[1]['start_date'], dt_1 + datetime.timedelta(minutes=11))
+
+    def test_chunk_sequence_days_and_invalid(self):
+        plan = dutils.ChunkSequence(datetime.datetime(2021, 1, 1), datetime.datetime(2021, 1, 1), 2)
+        self.assertEqual(list(plan), [{'start_date': '2021-01-01', 'end_date': '2021-01-01'}])
+        with self.assertRaises(ValueError):
+            dutils.ChunkSequence(datetime.datetime(2021, 1, 1), datetime.datetime(2021, 1, 2), 0)
+        with self.assertRaises(ValueError):
+            dutils.ChunkSequence(datetime.datetime(2021, 1, 2), datetime.datetime(2021, 1, 1), 1)
+
+    def test_chunk_sequence_dates(self):
+        plan = dutils.ChunkSequence(datetime.date(2021, 1, 1), datetime.date(2021, 1, 4), datetime.timedelta(days=2))
+        self.assertEqual(list(plan), [{'start_date': '2021-01-01', 'end_date': '2021-01-03'},
+                                      {'start_date': '2021-01-03', 'end_date': '2021-01-04'}])
+        with self.assertRaises(ValueError):
+            dutils.ChunkSequence(datetime.date(2021, 1, 1), datetime.date(2021, 1, 2), datetime.timedelta(hours=6))
+        with self.assertRaises(ValueError):
+            dutils.ChunkSequence(datetime.date(2021, 1, 1), datetime.date(2021, 1, 3), datetime.timedelta(hours=36))
+
+    def test_date_chunk(self):
+        class CountingDatetime(datetime.datetime):
+            calls = 0
+
+            def strftime(self, fmt):
+                CountingDatetime.calls += 1
+                return super().strftime(fmt)
+
+        chunk = dutils.DateChunk(CountingDatetime(2021, 1, 1), CountingDatetime(2021, 1, 2), '%Y-%m-%d')
+        self.assertEqual(CountingDatetime.calls, 0)
+        self.assertEqual(chunk['start_date'], '2021-01-01')
+        self.assertEqual(chunk['start_date'], '2021-01-01')
+        self.assertEqual(CountingDatetime.calls, 1)
+        self.assertEqual(chunk, {'start_date': '2021-01-01', 'end_date': '2021-01-02'})
+        self.assertEqual(dict(**chunk), {'start_date': '2021-01-01', 'end_date': '2021-01-02'})
+        self.assertEqual(chunk.start, datetime.datetime(2021, 1, 1))
+        self.assertIsNone(chunk.get('missing'))
+        with self.assertRaises(AttributeError):
+            chunk.start = datetime.datetime(2021, 1, 3)
+        with self.assertRaises(AttributeError):
+            chunk.other = 1
+        chunk = dutils.DateChunk(datetime.datetime(2021, 1, 1), datetime.datetime(2021, 1, 2))
+        self.assertEqual(pickle.loads(pickle.dumps(chunk)), chunk)
+
+    def test_split_dates_to_chunks_compact(self):
+        dt_1 = datetime.datetime(2021, 1, 1, 6, 0, 0, tzinfo=pytz.UTC)
+        dt_2 = datetime.datetime(2021, 3, 6, 0, 0, 0, tzinfo=pytz.UTC)
+        backends = (False, True) if HAS_NUMPY else (False,)
+        for vectorized in backends:
+            for intv, align in ((0, None), (7, None), (100, None), (1, 'week')):
+                with self.subTest(vectorized=vectorized, intv=intv, align=align):
+                    chunks = dutils.split_dates_to_chunks(dt_1, dt_2, intv, '%Y-%m-%d %H:%M %Z', align=align,
+                                                          vectorized=vectorized, compact=True)
+                    self.assertIsInstance(chunks[0], dutils.DateChunk)
+                    self.assertEqual(chunks[0].start, dt_1)
+                    self.assertEqual(chunks, dutils.split_dates_to_chunks(dt_1, dt_2, intv, '%Y-%m-%d %H:%M %Z',
+                                                                          align=align))
+        plan = dutils.ChunkSequence(dt_1, dt_2, datetime.timedelta(hours=7), compact=True)
+        self.assertIsInstance(plan[::2][-1], dutils.DateChunk)
+        self.assertEqual(list(plan), list(dutils.ChunkSequence(dt_1, dt_2, datetime.timedelta(hours=7))))
+
+    def test_split_dates_to_adaptive_chunks(self):
+        dt_1 = datetime.datetime(2020, 1, 1, tzinfo=pytz.UTC)
+        dt_2 = datetime.datetime(2021, 1, 1, tzinfo=pytz.UTC)
+        planner = dutils.split_dates_to_adaptive_chunks(dt_1, dt_2, 1, datetime.timedelta(hours=1), 30,
+                                                        target_size=1000, compact=True)
+        chunks = []
+        for chunk in planner:
+            chunks.append(chunk)
+            # 100 rows per day in the first half of the year, 2400 later
+            rows_per_day = 100 if chunk.start < datetime.datetime(2020, 7, 1, tzinfo=pytz.UTC) else 2400
+            days = (chunk.end - chunk.start) / datetime.timedelta(days=1)
+            self.assertIsNone(planner.send(dutils.ChunkFeedback(size=rows_per_day * days)))
+
+        self.assertEqual(chunks[0].end - chunks[0].start, datetime.timedelta(days=1))
+        self.assertEqual(chunks[1].end - chunks[1].start, datetime.timedelta(days=2))
+        self.assertEqual(chunks[-1].end, dt_2)
+        self.assertTrue(all(a.end == b.start for a, b in zip(chunks, chunks[1:])))
+        sizes = {chunk.end - chunk.start for chunk in chunks[5:-1]}
+        self.assertIn(datetime.timedelta(days=10), sizes)
+        self.assertLessEqual(max(sizes), datetime.timedelta(days=30))
+        last_sizes = {chunk.end - chunk.start for chunk in chunks[-10:-1]}
+        self.assertEqual(last_sizes, {datetime.timedelta(hours=10)})
+
+    def test_split_dates_to_adaptive_chunks_errors(self):
+        dt_1 = datetime.datetime(2021, 1, 1)
+        planner = dutils.split_dates_to_adaptive_chunks(dt_1, datetime.datetime(2021, 1, 3),
+                                                        datetime.timedelta(hours=8), datetime.timedelta(hours=2), 1,
+                                                        target_duration=10, strformat='%d %H:%M')
+        self.assertEqual(next(planner), {'start_date': '01 00:00', 'end_date': '01 08:00'})
+        planner.send(dutils.ChunkFeedback(error=TimeoutError()))
+        self.assertEqual(next(planner), {'start_date': '01 00:00', 'end_date': '01 04:00'})
+        planner.send(dutils.ChunkFeedback(elapsed=datetime.timedelta(seconds=1)))
+        self.assertEqual(next(planner), {'start_date': '01 04:00', 'end_date': '01 12:00'})
+        self.assertEqual(next(planner), {'start_date': '01 12:00', 'end_date': '01 20:00'})
+        planner.send(dutils.ChunkFeedback(error=TimeoutError()))
+        self.assertEqual(next(planner), {'start_date': '01 12:00', 'end_date': '01 16:00'})
+        planner.send(dutils.ChunkFeedback(error=TimeoutError()))
+        self.assertEqual(next(planner), {'start_date': '01 12:00', 'end_date': '01 14:00'})
+        with self.assertRaises(TimeoutError):
+            planner.send(dutils.ChunkFeedback(error=TimeoutError()))
+
+        with self.assertRaises(ValueError):
+            dutils.split_dates_to_adaptive_chunks(dt_1, dt_1, 1, 2, 1, target_size=10)
+        with self.assertRaises(ValueError):
+            dutils.split_dates_to_adaptive_chunks(dt_1, dt_1, 1, 1, 2)
+
+    def test_split_dates_by_weight(self):
+        dt_1 = datetime.datetime(2021, 1, 1)
+        dt_2 = datetime.datetime(2021, 1, 11)
+        weights = [1, 1, 1, 1, 1, 1, 2, 4, 8, 16]
+
+        chunks = dutils.split_dates_by_weight(dt_1, dt_2, weights, nr_chunks=3, strformat='%d', compact=True)
+        self.assertEqual([(chunk['start_date'], chunk['end_date']) for chunk in chunks],
+                         [('01', '09'), ('09', '10'), ('10', '11')])
+
+        chunks = dutils.split_dates_by_weight(dt_1, dt_2, weights, max_weight=8, strformat='%d')
+        self.assertEqual(chunks, [{'start_date': '01', 'end_date': '08'}, {'start_date': '08', 'end_date': '09'},
+                                  {'start_date': '09', 'end_date': '10'}, {'start_date': '10', 'end_date': '11'}])
+
+        # every chunk keeps at least one bucket and the last bucket is cut by the end date
+        chunks = dutils.split_dates_by_weight(dt_1, datetime.datetime(2021, 1, 1, 20), [100, 0, 0, 0],
+                                              bucket=datetime.timedelta(hours=6), nr_chunks=4, strformat='%H')
+        self.assertEqual([chunk['end_date'] for chunk in chunks], ['06', '12', '18', '20'])
+
+        chunks = dutils.split_dates_by_weight(dt_1, dt_2, [0] * 10, nr_chunks=5, strformat='%d')
+        self.assertEqual([chunk['end_date'] for chunk in chunks], ['03', '05', '07', '09', '11'])
+        for max_weight in (0.5, 100):
+            chunks = dutils.split_dates_by_weight(dt_1, dt_2, [0] * 10, max_weight=max_weight, strformat='%d')
+            self.assertEqual(chunks, [{'start_date': '01', 'end_date': '11'}])
+
+    def test_split_dates_by_weight_invalid(self):
+        dt_1 = datetime.datetime(2021, 1, 1)
+        dt_2 = datetime.datetime(2021, 1, 4)
+        invalid_arguments = [dict(weights=[1, 1, 1]), dict(weights=[1, 1, 1], nr_chunks=1, max_weight=1),
+                             dict(weights=[1, 1], nr_chunks=1), dict(weights=[1, 1, 1], nr_chunks=4),
+                             dict(weights=[1, -1, 1], nr_chunks=1), dict(weights=[1, 1, 1], max_weight=0)]
+        for kwargs in invalid_arguments:
+            with self.subTest(kwargs=kwargs), self.assertRaises(ValueError):
+                dutils.split_dates_by_weight(dt_1, dt_2, **kwargs)
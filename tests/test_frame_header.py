@@ -0,0 +1,87 @@
+import importlib.util
+import unittest
+
+from keboola.utils.frame_header import normalize_arrow_schema, normalize_arrow_table, normalize_dataframe_columns
+from keboola.utils.header_normalizer import get_normalizer, NormalizerStrategy
+
+HAS_PANDAS = importlib.util.find_spec('pandas') is not None
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+@unittest.skipUnless(HAS_PANDAS, "pandas is not installed")
+class TestDataFrameColumns(unittest.TestCase):
+
+    def setUp(self):
+        import numpy
+        import pandas
+        self.numpy = numpy
+        self.data_frame = pandas.DataFrame({'user id': numpy.arange(1000), 'e-mail#': numpy.ones(1000), 1: 'x'})
+        self.normalizer = get_normalizer(NormalizerStrategy.DEFAULT, forbidden_sub="_")
+
+    def _assert_shares_data(self, result):
+        for original, normalized in zip(self.data_frame.columns[:2], result.columns[:2]):
+            self.assertTrue(self.numpy.shares_memory(self.data_frame[original].to_numpy(),
+                                                     result[normalized].to_numpy()))
+
+    def test_normalize_dataframe_columns(self):
+        result = normalize_dataframe_columns(self.data_frame, self.normalizer)
+
+        self.assertEqual(list(result.columns), ['user_id', 'e_mail_', '1'])
+        self.assertEqual(list(self.data_frame.columns), ['user id', 'e-mail#', 1])
+        self._assert_shares_data(result)
+
+    def test_normalize_dataframe_columns_inplace(self):
+        values = self.data_frame['user id'].to_numpy()
+
+        result = normalize_dataframe_columns(self.data_frame, self.normalizer, inplace=True)
+
+        self.assertIs(result, self.data_frame)
+        self.assertEqual(list(result.columns), ['user_id', 'e_mail_', '1'])
+        self.assertTrue(self.numpy.shares_memory(values, result['user_id'].to_numpy()))
+
+    def test_multi_level_columns_raise(self):
+        import pandas
+        self.data_frame.columns = pandas.MultiIndex.from_tuples([('a', 'b'), ('a', 'c'), ('d', 'e')])
+        with self.assertRaises(ValueError):
+            normalize_dataframe_columns(self.data_frame, self.normalizer)
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestArrowColumns(unittest.TestCase):
+
+    def setUp(self):
+        import pyarrow
+        self.pyarrow = pyarrow
+        self.table = pyarrow.table({'user id': list(range(1000)), 'e-mail#': ['a@b.c'] * 1000},
+                                   metadata={'source': 'test'})
+        self.normalizer = get_normalizer(NormalizerStrategy.DEFAULT, forbidden_sub="_")
+
+    @staticmethod
+    def _buffer_addresses(table):
+        return [buffer.address for column in table.columns for chunk in column.chunks
+                for buffer in chunk.buffers() if buffer is not None]
+
+    def test_normalize_arrow_table(self):
+        result = normalize_arrow_table(self.table, self.normalizer)
+
+        self.assertEqual(result.column_names, ['user_id', 'e_mail_'])
+        self.assertEqual(result.schema.metadata, {b'source': b'test'})
+        self.assertEqual(self._buffer_addresses(result), self._buffer_addresses(self.table))
+
+    def test_normalize_arrow_record_batch(self):
+        batch = self.table.to_batches()[0]
+        result = normalize_arrow_table(batch, self.normalizer)
+
+        self.assertEqual(result.schema.names, ['user_id', 'e_mail_'])
+        self.assertEqual(result.column(0).buffers()[1].address, batch.column(0).buffers()[1].address)
+
+    def test_normalize_arrow_schema(self):
+        schema = self.pyarrow.schema([self.pyarrow.field('user id', self.pyarrow.int64(), nullable=False,
+                                                         metadata={'key': 'value'})], metadata={'source': 'test'})
+
+        result = normalize_arrow_schema(schema, self.normalizer)
+
+        self.assertEqual(result.names, ['user_id'])
+        self.assertFalse(result.field(0).nullable)
+        self.assertEqual(result.field(0).metadata, {b'key': b'value'})
+        self.assertEqual(result.metadata, {b'source': b'test'})
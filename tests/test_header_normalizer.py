@@ -1,6 +1,11 @@
+import gzip
+import json
+import os
+import tempfile
 import unittest
 
-from keboola.utils.header_normalizer import get_normalizer, NormalizerStrategy
+from keboola.utils.header_normalizer import CachedHeaderNormalizer, get_normalizer, normalize_records, \
+    NormalizerStrategy
 
 
 class TestFormatterUtils(unittest.TestCase):
@@ -63,3 +68,221 @@ class TestFormatterUtils(unittest.TestCase):
         headers = ["dactor#fd", "a*ruas$", "48DHBb#@"]
         norm_headers = head_norm.normalize_header(headers)
         self.assertEqual(norm_headers, ['dactor_35_fd', 'a_42_ruas_36_', '48DHBb_35__64_'])
+
+    def test_replace_not_permitted_special_chars(self):
+        head_norm = get_normalizer(strategy=NormalizerStrategy.DEFAULT, permitted_chars="a-z]^\\_", forbidden_sub="\\")
+        headers = ["a-b]c^d\\e", "x y", "^^"]
+        norm_headers = head_norm.normalize_header(headers)
+        self.assertEqual(norm_headers, ["a-\\]\\^\\\\\\", "\\_\\", "^^"])
+
+    def test_normalize_header_encoding_non_ascii(self):
+        headers = ["čas zápisu", "名前", "😀 emoji#", "a-b c"]
+        expected = {
+            "unicode": ['_269_as_z_225_pisu', '_21517__21069_', '_128512__emoji_35_', 'a_45_b_c'],
+            "utf8": ["_b'\\xc4\\x8d'_as_z_b'\\xc3\\xa1'_pisu", "_b'\\xe5\\x90\\x8d'__b'\\xe5\\x89\\x8d'_",
+                     "_b'\\xf0\\x9f\\x98\\x80'__emoji_b'#'_", "a_b'-'_b_c"],
+        }
+        for encoder, expected_header in expected.items():
+            with self.subTest(encoder=encoder):
+                head_norm = get_normalizer(strategy=NormalizerStrategy.ENCODER, char_encoder=encoder)
+                # repeated to exercise the memoized encodings
+                self.assertEqual(head_norm.normalize_header(headers), expected_header)
+                self.assertEqual(head_norm.normalize_header(headers), expected_header)
+
+    def test_replace_chars_using_dict_single_pass(self):
+        replace_dict = {"#": "hsh", "h": "H", "##": "dbl", "-": "_"}
+        head_norm = get_normalizer(strategy=NormalizerStrategy.DICT, replace_dict=replace_dict)
+        headers = ["a##b#h", "x-y", "plain"]
+        self.assertEqual(head_norm.normalize_header(headers), ["adblbhshH", "x_y", "plain"])
+
+    def test_replace_chars_using_dict_sequential(self):
+        replace_dict = {"#": "hsh", "h": "H", "##": "dbl"}
+        head_norm = get_normalizer(strategy=NormalizerStrategy.DICT, replace_dict=replace_dict,
+                                   sequential_replace=True)
+        self.assertEqual(head_norm.normalize_header(["a##b#h"]), ["aHsHHsHbHsHH"])
+
+    def test_replace_chars_using_dict_single_chars(self):
+        head_norm = get_normalizer(strategy=NormalizerStrategy.DICT, replace_dict={"#": "h", "h": "H", "": "x"})
+        self.assertEqual(head_norm.normalize_header(["#h"]), ["hH"])
+
+    def test_replace_chars_using_dict_prefix_keys(self):
+        replace_dict = {"ab": "1", "abc": "2", "abd": "3", "a": "4", "b.": "5"}
+        head_norm = get_normalizer(strategy=NormalizerStrategy.DICT, replace_dict=replace_dict)
+        self.assertEqual(head_norm.normalize_header(["abcabdabaxb.b"]), ["2314x5b"])
+
+    def test_normalize_header_resolve_duplicates(self):
+        head_norm = get_normalizer(strategy=NormalizerStrategy.DEFAULT, resolve_duplicates=True)
+        headers = ["a#b", "ab", "ab_1", "a b", "#", "empty_1", "a@b", ""]
+        norm_headers = head_norm.normalize_header(headers)
+        self.assertEqual(norm_headers, ["ab", "ab_2", "ab_1", "a_b", "empty_2", "empty_1", "ab_3", "empty_3"])
+
+    def test_normalize_header_duplicates_kept_by_default(self):
+        head_norm = get_normalizer(strategy=NormalizerStrategy.DEFAULT)
+        self.assertEqual(head_norm.normalize_header(["a#b", "ab"]), ["ab", "ab"])
+
+    def test_normalize_header_resolve_duplicates_wide(self):
+        head_norm = get_normalizer(strategy=NormalizerStrategy.ENCODER, resolve_duplicates=True)
+        headers = ["col"] * 25_000 + [f"col_{i}" for i in range(1, 25_001)]
+        norm_headers = head_norm.normalize_header(headers)
+        self.assertEqual(len(set(norm_headers)), 50_000)
+        self.assertEqual(norm_headers[:3], ["col", "col_25001", "col_25002"])
+        self.assertEqual(norm_headers[25_000:25_002], ["col_1", "col_2"])
+
+    def test_decode_encoded_header(self):
+        headers = ["dactor#fd", "a*ruas$", "čas", "名前😀", "quote'\"", "plain", ""]
+        for encoder in ("unicode", "utf8"):
+            with self.subTest(encoder=encoder):
+                head_norm = get_normalizer(strategy=NormalizerStrategy.ENCODER, char_encoder=encoder)
+                norm_headers = head_norm.normalize_header(headers)
+                expected = headers[:-1] + ["empty_1"]
+                self.assertEqual(head_norm.decode_header(norm_headers), expected)
+                self.assertEqual([head_norm.decode_column_name(c) for c in norm_headers], expected)
+
+    def test_decode_tokens_never_encoded(self):
+        cases = (("unicode", ["id_9999999_x", "a_97_b", "c_35_"], ["id_9999999_x", "a_97_b", "c#"]),
+                 ("utf8", ["id_9999999_x", "a_97_b"], ["id_9999999_x", "a_97_b"]))
+        for encoder, header, expected in cases:
+            with self.subTest(encoder=encoder):
+                head_norm = get_normalizer(strategy=NormalizerStrategy.ENCODER, char_encoder=encoder)
+                self.assertEqual(head_norm.decode_header(header), expected)
+                self.assertEqual([head_norm.decode_column_name(column) for column in header], expected)
+                self.assertEqual(head_norm.decode_header(["id_b'\\xff'_", "x_b'a'_"]), ["id_b'\\xff'_", "x_b'a'_"])
+
+    def test_decode_tokens_of_whitespace_or_other_form(self):
+        head_norm = get_normalizer(strategy=NormalizerStrategy.ENCODER)
+        header = ["a_32_b", "row_9_x", "a_160_b", "a_035_b", "a_12288_b"]
+        self.assertEqual(head_norm.decode_header(header), header)
+        self.assertEqual([head_norm.decode_column_name(column) for column in header], header)
+        self.assertEqual(head_norm.decode_header(["a_35_b", "a_160_b_35_"]), ["a#b", "a_160_b#"])
+        utf8_norm = get_normalizer(strategy=NormalizerStrategy.ENCODER, char_encoder="utf8")
+        utf8_header = ["a_b' '_b", "a_b\"\\xc5\\xa1\"_b"]
+        self.assertEqual(utf8_norm.decode_header(utf8_header), utf8_header)
+
+    def test_decode_custom_delimiter(self):
+        head_norm = get_normalizer(strategy=NormalizerStrategy.ENCODER, encode_delimiter="X")
+        self.assertEqual(head_norm.normalize_header(["a#b"]), ["aX35Xb"])
+        self.assertEqual(head_norm.decode_header(["aX35Xb", "X"]), ["a#b", "X"])
+
+    def test_header_mapping(self):
+        head_norm = get_normalizer(strategy=NormalizerStrategy.ENCODER)
+        mapping = head_norm.get_mapping(["a#", "b c"])
+        self.assertEqual(mapping.normalized("a#"), "a_35_")
+        self.assertEqual(mapping.original("b_c"), "b c")
+        self.assertEqual(list(mapping), [("a#", "a_35_"), ("b c", "b_c")])
+
+        decoded = head_norm.decode_mapping(["a_35_", "x_64_y"])
+        self.assertEqual(decoded.original("x_64_y"), "x@y")
+        self.assertEqual(decoded.normalized("a#"), "a_35_")
+        with self.assertRaises(KeyError):
+            decoded.original("unknown")
+
+    def test_cached_normalizer(self):
+        normalizer = CachedHeaderNormalizer(get_normalizer(strategy=NormalizerStrategy.ENCODER), maxsize=3)
+        self.assertTrue(normalizer)
+        headers = ["a#", "b c", "a#", "", "d"]
+        self.assertEqual(normalizer.normalize_header(headers), ["a_35_", "b_c", "a_35_", "empty_1", "d"])
+        self.assertEqual((normalizer.hits, normalizer.misses, normalizer.cache_size), (1, 4, 3))
+
+    def test_cached_normalizer_persisted(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, "names.json.gz")
+            normalizer = CachedHeaderNormalizer(get_normalizer(strategy=NormalizerStrategy.DICT,
+                                                               replace_dict={"#": "H"}), cache_path=cache_path)
+            normalizer.normalize_header(["a#", "čas"])
+            normalizer.save()
+            self.assertEqual(os.listdir(temp_dir), ["names.json.gz"])
+
+            loaded = CachedHeaderNormalizer(get_normalizer(strategy=NormalizerStrategy.DICT,
+                                                           replace_dict={"#": "H"}), cache_path=cache_path)
+            self.assertEqual(loaded.normalize_header(["a#", "čas", "b#"]), ["aH", "čas", "bH"])
+            self.assertEqual((loaded.hits, loaded.misses), (2, 1))
+
+            other_config = CachedHeaderNormalizer(get_normalizer(strategy=NormalizerStrategy.DICT,
+                                                                 replace_dict={"#": "X"}))
+            self.assertFalse(other_config.load(cache_path))
+            self.assertEqual(other_config.normalize_header(["a#"]), ["aX"])
+
+    def test_cached_normalizer_invalid_file(self):
+        config = get_normalizer(NormalizerStrategy.DEFAULT).get_config()
+        contents = {"garbage.json.gz": b"not a cache",
+                    "text.json.gz": gzip.compress(b"{not json"),
+                    "list.json.gz": gzip.compress(b"[]"),
+                    "no_names.json.gz": gzip.compress(json.dumps({"config": config}).encode())}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for file_name, content in contents.items():
+                with self.subTest(file_name=file_name):
+                    cache_path = os.path.join(temp_dir, file_name)
+                    with open(cache_path, "wb") as f:
+                        f.write(content)
+                    normalizer = CachedHeaderNormalizer(get_normalizer(NormalizerStrategy.DEFAULT),
+                                                        cache_path=cache_path)
+                    self.assertEqual(normalizer.cache_size, 0)
+                    self.assertFalse(normalizer.load())
+                    self.assertEqual(normalizer.normalize_header(["a b"]), ["a_b"])
+                    normalizer.save()
+                    self.assertTrue(normalizer.load())
+
+    def test_normalize_records(self):
+        records = iter([{"user id": 1, "address": {"zip#": "123", "": 1}},
+                        {"user id": 2, "address": {"zip#": "456", "": 2}, "tags": ["x"]}])
+        normalized = normalize_records(records, get_normalizer(strategy=NormalizerStrategy.DEFAULT))
+        self.assertEqual(next(normalized), {"user_id": 1, "address": {"zip": "123", "empty_1": 1}})
+        self.assertEqual(next(normalized), {"user_id": 2, "address": {"zip": "456", "empty_1": 2}, "tags": ["x"]})
+
+    def test_normalize_records_flatten(self):
+        records = [{"a": {"b c": 1, "d": {"e#": 2}}, "f": {}, "g": [{"h": {"i#": 1}}, [{"j k": 2}], 3]}]
+        normalized = normalize_records(records, get_normalizer(strategy=NormalizerStrategy.ENCODER), flatten=True,
+                                       maxsize=1)
+        self.assertEqual(list(normalized), [{"a_b_c": 1, "a_d_e_35_": 2, "f": {},
+                                             "g": [{"h_i_35_": 1}, [{"j_k": 2}], 3]}])
+
+    def test_normalize_records_lists(self):
+        records = [{"a b": [{"c#": 1}, [{"d e": {"f#": 2}}], "g h"], "i": []}]
+        normalized = normalize_records(records, get_normalizer(strategy=NormalizerStrategy.DEFAULT))
+        self.assertEqual(list(normalized), [{"a_b": [{"c": 1}, [{"d_e": {"f": 2}}], "g h"], "i": []}])
+
+    def test_normalize_records_colliding_keys(self):
+        normalizer = get_normalizer(strategy=NormalizerStrategy.DEFAULT)
+        self.assertEqual(list(normalize_records([{"a#b": 1, "ab": 2}], normalizer)), [{"ab": 1, "ab_1": 2}])
+        self.assertEqual(list(normalize_records([{"a": {"b": 1}, "a_b": 2}], normalizer, flatten=True)),
+                         [{"a_b": 1, "a_b_1": 2}])
+
+        with self.assertRaises(ValueError):
+            list(normalize_records([{"a#b": 1, "ab": 2}], normalizer, resolve_duplicates=False))
+        with self.assertRaises(ValueError):
+            list(normalize_records([{"a": {"b": 1}, "a_b": 2}], normalizer, flatten=True, resolve_duplicates=False))
+
+    def test_normalize_header_transliterate(self):
+        head_norm = get_normalizer(strategy=NormalizerStrategy.TRANSLITERATE, forbidden_sub="_")
+        header = ["čas", "Straße Ünïcode", "東京", "ﬁle №1", "a#b", "Łódź", ""]
+        self.assertEqual(head_norm.normalize_header(header),
+                         ["cas", "Strasse_Unicode", "__", "file_No1", "a_b", "Lodz", "empty_1"])
+
+    def test_normalize_header_transliterate_permitted_output(self):
+        head_norm = get_normalizer(strategy=NormalizerStrategy.TRANSLITERATE, forbidden_sub="x",
+                                   permitted_chars="abcdefghijklmnopqrstuvwxyz_", replace_dict={"ä": "ae"})
+        self.assertEqual(head_norm.normalize_header(["Čas", "räder", "東", "½"]), ["xas", "raeder", "x", "x"])
+        normalized = head_norm.normalize_header(["".join(map(chr, range(0x10000, 0x10100))) + "".join(
+            chr(c) for c in range(0x20, 0x10000) if not 0xD800 <= c < 0xE000)])
+        self.assertTrue(set(normalized[0]) <= set("abcdefghijklmnopqrstuvwxyz_"))
+
+    def test_transliterate_invalid_replace_dict(self):
+        with self.assertRaises(ValueError):
+            get_normalizer(strategy=NormalizerStrategy.TRANSLITERATE, replace_dict={"ä": "a#"})
+        with self.assertRaises(ValueError):
+            get_normalizer(strategy=NormalizerStrategy.TRANSLITERATE, replace_dict={"ae": "a"})
+
+    def test_normalize_header_compact_encoders(self):
+        header = ["a#", "名 x"]
+        cases = (("hex", ["a_23_", "_540d__x"]),
+                 ("utf8_hex", ["a_23_", "_e5908d__x"]),
+                 ("base36", ["a_z_", "_glp__x"]))
+        for encoder, expected in cases:
+            with self.subTest(encoder=encoder):
+                head_norm = get_normalizer(strategy=NormalizerStrategy.ENCODER, char_encoder=encoder)
+                self.assertEqual(head_norm.normalize_header(header), expected)
+                # the codes are indistinguishable from words, e.g. `face` is a hex code as well
+                with self.assertRaises(ValueError):
+                    head_norm.decode_column_name("my_face_id")
+                with self.assertRaises(ValueError):
+                    head_norm.decode_header(expected)
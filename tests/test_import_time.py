@@ -0,0 +1,56 @@
+import pathlib
+import subprocess
+import sys
+import unittest
+
+SRC_DIR = str(pathlib.Path(__file__).resolve().parents[1].joinpath('src'))
+
+HEAVY_MODULES = ('dateparser', 'pytz', 'dateutil', 'pandas', 'pyarrow', 'numpy')
+
+# cumulative cold import budget in microseconds; importing `dateparser` alone costs several hundred ms
+IMPORT_BUDGET_US = 150_000
+RUNS = 3
+
+
+def _cold_import(module: str):
+    """
+    Imports the module in a fresh interpreter with `-X importtime`.
+
+    Returns:
+        (cumulative import time of the module in microseconds, list of heavy modules that were loaded)
+    """
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=SRC_DIR,
+                            capture_output=True, text=True, check=True)
+    cumulative = None
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative = int(parts[1])
+    loaded = [m for m in result.stdout.strip().split(',') if m]
+    return cumulative, loaded
+
+
+class TestImportTime(unittest.TestCase):
+    modules = ['keboola.utils', 'keboola.utils.date', 'keboola.utils.helpers', 'keboola.utils.char_encoder',
+               'keboola.utils.header_normalizer', 'keboola.utils.frame_header', 'keboola.utils.chunk_executor']
+
+    def test_heavy_dependencies_not_imported(self):
+        for module in self.modules:
+            with self.subTest(module=module):
+                _, loaded = _cold_import(module)
+                self.assertEqual(loaded, [])
+
+    def test_cold_import_within_budget(self):
+        for module in self.modules:
+            with self.subTest(module=module):
+                best = min(_cold_import(module)[0] for _ in range(RUNS))
+                self.assertLess(best, IMPORT_BUDGET_US,
+                                f"Cold import of {module} took {best / 1000:.1f} ms")
+
+    def test_package_members_resolve_lazily(self):
+        code = ("import sys, keboola.utils as u; assert 'dateparser' not in sys.modules; "
+                "f = u.parse_datetime_interval; from keboola.utils import *; "
+                "assert split_dates_to_chunks is u.date.split_dates_to_chunks")
+        subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR, check=True)